@@ -6,13 +6,16 @@ from sentinel import LLMSecretDetector, instrument_model_class
 from conversation_history_manager import ConversationHistoryManager
 from conversation_manager import ConversationManager
 from personal_assistant import PersonalAssistant
+from utils import EchoLevel
+from tool_registry import shared_resources
 from dotenv import load_dotenv
 
 
 class ChatbotRunner:
     def __init__(self, assistant):
         self.assistant = assistant
-        self.conversation_manager = ConversationManager(self.assistant)
+        # The console is the chat interface here, so messages are echoed in full
+        self.conversation_manager = ConversationManager(self.assistant, echo_level=EchoLevel.FULL)
         self.conversation_history_manager = ConversationHistoryManager()
 
     async def run(self):
@@ -47,12 +50,14 @@ if __name__ == "__main__":
         llm = WrappedClass(model="gpt-4o-2024-08-06", temperature=0)
 
         assistant = PersonalAssistant(user_id='gkour', llm=llm)
-        assistant.initialize()  # Await initialization if it is async
+        await assistant.ainitialize()  # Serve as soon as the core is ready; slow tools keep loading
         runner = ChatbotRunner(assistant)
         try:
             await runner.run()  # Await run since it is async
         finally:
             await assistant.cleanup()  # Clean up resources asynchronously
+            await shared_resources.aclose()  # Close the browser and other clients shared by the process
+            runner.conversation_history_manager.close()  # Let pending summaries finish
 
 
     asyncio.run(main())
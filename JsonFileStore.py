@@ -1,55 +1,360 @@
+import asyncio
+import heapq
+import itertools
 import json
-from typing import Iterable, Any, Optional
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Any, Optional, Iterator
 from langgraph.store.base import BaseStore, Op, Result, GetOp, PutOp, SearchOp, ListNamespacesOp
+from VectorIndex import VectorIndex
+
+
+# Version of the data layout. Each namespace is stored as {"items": {key: value}, "namespaces": {label: ...}},
+# so items are never mistaken for namespaces whatever their values look like.
+STORE_FORMAT = 2
+
+
+def _new_namespace_data() -> dict:
+    return {"items": {}, "namespaces": {}}
+
+
+def iter_json_items(data: dict):
+    """Yield (namespace, key, value) for every item of the data of a JSONFileStore file."""
+    if data.get("__format__") == STORE_FORMAT:
+        yield from _iter_namespace_items(data, ())
+    else:
+        yield from _iter_legacy_items(data, ())
+
+
+def _iter_namespace_items(data: dict, namespace: tuple[str, ...]):
+    for key, value in data["items"].items():
+        yield namespace, key, value
+    for label, child in data["namespaces"].items():
+        yield from _iter_namespace_items(child, namespace + (label,))
+
+
+def _iter_legacy_items(node: dict, namespace: tuple[str, ...]):
+    """Read a file written before STORE_FORMAT, where namespaces and items were both plain nested dictionaries.
+
+    Those files do not record the boundary, so a dictionary whose values are all non-empty dictionaries is
+    taken as a namespace and anything else as an item. They are rewritten in the current format on the next
+    save.
+    """
+    for key, value in node.items():
+        if not isinstance(value, dict):
+            continue
+        if value and all(isinstance(v, dict) and v for v in value.values()):
+            yield from _iter_legacy_items(value, namespace + (key,))
+        else:
+            yield namespace, key, value
+
+
+def namespace_matches(namespace: tuple[str, ...], condition) -> bool:
+    """Check a namespace against a MatchCondition; '*' in the condition path matches any label."""
+    path = tuple(condition.path)
+    if len(path) > len(namespace):
+        return False
+    labels = namespace[:len(path)] if condition.match_type == "prefix" else namespace[len(namespace) - len(path):]
+    return all(p == "*" or p == label for p, label in zip(path, labels))
+
+
+def _is_indexable(value: Any) -> bool:
+    return isinstance(value, (str, int, float, bool))
+
+
+class _NamespaceNode:
+    """A node of the namespace trie, holding the item keys of its namespace and their field indexes."""
+
+    __slots__ = ("children", "data", "container", "keys", "field_index")
+
+    def __init__(self, data: dict):
+        self.children = {}  # label -> _NamespaceNode
+        self.data = data  # The data dictionary of this namespace
+        self.container = data["items"]  # key -> value of the items of this namespace
+        self.keys = {}  # Item keys in insertion order (values unused)
+        self.field_index = {}  # field -> value -> {key: None}
+
+    def add(self, key: str, value: dict):
+        self.keys[key] = None
+        for field, field_value in value.items():
+            if _is_indexable(field_value):
+                self.field_index.setdefault(field, {}).setdefault(field_value, {})[key] = None
+
+    def remove(self, key: str, value: dict):
+        self.keys.pop(key, None)
+        for field, field_value in value.items():
+            if _is_indexable(field_value):
+                bucket = self.field_index.get(field, {}).get(field_value)
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del self.field_index[field][field_value]
+
+    def walk(self, namespace: tuple[str, ...]) -> Iterator[tuple[tuple[str, ...], "_NamespaceNode"]]:
+        """Yield this node and all nodes below it, depth first."""
+        yield namespace, self
+        for label, child in list(self.children.items()):
+            yield from child.walk(namespace + (label,))
+
+    def matching(self, filter: Optional[dict]) -> Iterator[tuple[str, dict]]:
+        """Yield the (key, value) pairs of this namespace matching the equality filter."""
+        keys = self.keys
+        if filter:
+            buckets = [self.field_index.get(field, {}).get(value, {})
+                       for field, value in filter.items() if _is_indexable(value)]
+            if buckets:
+                keys = min(buckets, key=len)
+        for key in list(keys):
+            value = self.container[key]
+            if not filter or all(value.get(k) == v for k, v in filter.items()):
+                yield key, value
 
 
 class JSONFileStore(BaseStore):
-    """A custom store backed by a JSON file for persistent key-value storage."""
+    """A custom store backed by a JSON file for persistent key-value storage.
+
+    In WAL mode (``wal=True``) puts and deletes are appended as compact records to
+    ``<file_path>.wal`` instead of rewriting the whole JSON file. Once the log holds
+    ``compact_threshold`` records it is compacted in the background into a new snapshot.
+    On startup the snapshot is loaded and the log is replayed on top of it; a compaction interrupted
+    by a crash is then finished.
+
+    Only batches that write mark the store dirty. Writes are group-committed: they reach disk once
+    ``flush_every`` writes are pending or ``flush_interval_ms`` after the first pending write,
+    whichever comes first, and on ``flush``/``close``.
+
+    ``abatch`` never blocks the event loop: batches are handed to a single writer thread, whose
+    queue preserves submission order, and the serialization and file I/O happen there.
+
+    The file records which dictionaries are namespaces and which are items (see STORE_FORMAT), so any
+    JSON value round-trips; files written in the older plain nested layout are still read.
 
-    def __init__(self, file_path: str = "store.json"):
+    A namespace trie with per-field equality indexes is maintained next to the data, so searches
+    and namespace listings only visit the matching namespaces and items.
+
+    Passing ``index`` (``{"embed": ..., "fields": [...]}``, both optional) enables semantic search:
+    ``SearchOp.query`` then ranks items by cosine similarity using a local vector index.
+    """
+
+    def __init__(self, file_path: str = "store.json", wal: bool = False, compact_threshold: int = 1000,
+                 flush_every: int = 1, flush_interval_ms: Optional[int] = None, index: Optional[dict] = None):
         self.file_path = file_path
+        self.wal = wal
+        self.flush_every = flush_every
+        self.flush_interval_ms = flush_interval_ms
+        self._dirty = False
+        self._pending_writes = 0
+        self._flush_timer = None
+        self.wal_path = f"{file_path}.wal"
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._wal_file = None
+        self._wal_records = 0
+        self._compaction_thread = None
+        self._compaction_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="json-store-writer")
+        self._vectors = VectorIndex(index.get("embed"), index.get("fields")) if index is not None else None
         self._load_data()
+        self._rebuild_index()
+        if self.wal:
+            self._replay_wal()
+            if os.path.exists(f"{self.wal_path}.compacting"):
+                # A compaction was interrupted: finish it now that its records are loaded
+                self.compact()
 
     def _load_data(self):
         """Load data from the JSON file."""
         try:
             with open(self.file_path, "r") as file:
-                self.data = json.load(file)
+                data = json.load(file)
         except (FileNotFoundError, json.JSONDecodeError):
-            self.data = {}  # Initialize with empty data if file doesn't exist or is invalid
+            data = {}  # Initialize with empty data if file doesn't exist or is invalid
+        if data.get("__format__") == STORE_FORMAT:
+            self.data = data
+            return
+        self.data = {"__format__": STORE_FORMAT, **_new_namespace_data()}
+        for namespace, key, value in list(_iter_legacy_items(data, ())):
+            target = self.data
+            for label in namespace:
+                target = target["namespaces"].setdefault(label, _new_namespace_data())
+            target["items"][key] = value
 
     def _save_data(self):
         """Save data to the JSON file."""
-        with open(self.file_path, "w") as file:
+        if self.wal:
+            self.compact()
+            return
+        # Write to a temporary file and rename it so a crash never leaves a half-written store
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, "w") as file:
             json.dump(self.data, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.file_path)
+
+    def _mark_dirty(self, writes: int):
+        """Record pending writes and flush them according to the group-commit policy."""
+        self._dirty = True
+        self._pending_writes += writes
+        if self._pending_writes >= self.flush_every:
+            self.flush()
+        elif self.flush_interval_ms is not None and self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval_ms / 1000, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Persist all pending writes."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            if self.wal:
+                self._flush_wal()
+            else:
+                self._save_data()
+            self._dirty = False
+            self._pending_writes = 0
+
+    def _replay_wal(self):
+        """Apply the records of a pending compaction log and of the current log on top of the snapshot."""
+        for path in (f"{self.wal_path}.compacting", self.wal_path):
+            try:
+                with open(path, "r") as file:
+                    for line in file:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # Torn final record from an interrupted append
+                        self._apply_record(record)
+                        if path == self.wal_path:
+                            self._wal_records += 1
+            except FileNotFoundError:
+                continue
+
+    def _apply_record(self, record: dict):
+        """Apply a single log record to the in-memory data."""
+        namespace, key = tuple(record["ns"]), record["key"]
+        if record["op"] == "put":
+            self._set_item(namespace, key, record["value"])
+        elif record["op"] == "del":
+            self._remove_item(namespace, key)
+
+    def _append_record(self, record: dict):
+        """Append a compact record to the write-ahead log."""
+        if self._wal_file is None:
+            self._wal_file = open(self.wal_path, "a")
+        self._wal_file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._wal_records += 1
+
+    def _flush_wal(self):
+        """Flush appended log records to disk and trigger compaction when the log grows too large."""
+        if self._wal_file is not None:
+            self._wal_file.flush()
+            os.fsync(self._wal_file.fileno())
+        if self._wal_records >= self.compact_threshold and not self._compaction_running():
+            self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+            self._compaction_thread.start()
+
+    def _compaction_running(self) -> bool:
+        return self._compaction_thread is not None and self._compaction_thread.is_alive()
+
+    def compact(self):
+        """Write the current data as a new snapshot and discard the log records it contains."""
+        compacting_path = f"{self.wal_path}.compacting"
+        with self._compaction_lock:
+            with self._lock:
+                snapshot = json.dumps(self.data, indent=4)
+                # Rotate the log so appends made while the snapshot is written go to a fresh file
+                if self._wal_file is not None:
+                    self._wal_file.close()
+                    self._wal_file = None
+                if os.path.exists(self.wal_path):
+                    if os.path.exists(compacting_path):
+                        self._append_to_compacting_log(compacting_path)
+                    else:
+                        os.replace(self.wal_path, compacting_path)
+                self._wal_records = 0
+
+            tmp_path = f"{self.file_path}.tmp"
+            with open(tmp_path, "w") as file:
+                file.write(snapshot)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.file_path)
+            if os.path.exists(compacting_path):
+                os.remove(compacting_path)
+
+    def _append_to_compacting_log(self, compacting_path: str):
+        """Move the log's records after those of an unfinished compaction, which must not be overwritten."""
+        with open(compacting_path, "ab+") as target:
+            target.seek(0, os.SEEK_END)
+            if target.tell():
+                target.seek(-1, os.SEEK_END)
+                if target.read(1) != b"\n":
+                    target.write(b"\n")  # End a torn final record so the next one stays readable
+            with open(self.wal_path, "rb") as source:
+                shutil.copyfileobj(source, target)
+            target.flush()
+            os.fsync(target.fileno())
+        os.remove(self.wal_path)
+
+    def close(self):
+        """Flush pending writes and close the write-ahead log."""
+        # Let batches already queued by abatch finish before the final flush
+        self._writer.shutdown(wait=True)
+        self.flush()
+        if self._compaction_running():
+            self._compaction_thread.join()
+        with self._lock:
+            if self._wal_file is not None:
+                self._wal_file.close()
+                self._wal_file = None
 
     def batch(self, ops: Iterable[Op]) -> list[Result]:
         """Execute multiple operations synchronously."""
         results = []
-        for op in ops:
-            if isinstance(op, GetOp):
-                results.append(self._get(op.namespace, op.key))
-            elif isinstance(op, PutOp):
-                results.append(self._put(op.namespace, op.key, op.value))
-            # elif isinstance(op, DeleteOp):
-            #     results.append(self._delete(op.namespace, op.key))
-            elif isinstance(op, SearchOp):
-                results.append(self._search(op.namespace_prefix, op.filter, op.limit, op.offset))
-            elif isinstance(op, ListNamespacesOp):
-                results.append(self._list_namespaces(op.match_conditions, op.max_depth, op.limit, op.offset))
-            else:
-                raise ValueError(f"Unsupported operation type: {type(op)}")
-        self._save_data()
+        with self._lock:
+            writes = 0
+            for op in ops:
+                if isinstance(op, GetOp):
+                    results.append(self._get(op.namespace, op.key))
+                elif isinstance(op, PutOp):
+                    writes += 1
+                    if op.value is None:
+                        # BaseStore.delete is expressed as a PutOp without a value
+                        results.append(self._delete(op.namespace, op.key))
+                    else:
+                        results.append(self._put(op.namespace, op.key, op.value))
+                elif isinstance(op, SearchOp):
+                    results.append(self._search(op.namespace_prefix, op.filter, op.limit, op.offset, op.query))
+                elif isinstance(op, ListNamespacesOp):
+                    results.append(self._list_namespaces(op.match_conditions, op.max_depth, op.limit, op.offset))
+                else:
+                    raise ValueError(f"Unsupported operation type: {type(op)}")
+            # Read-only batches never touch the disk
+            if writes:
+                self._mark_dirty(writes)
         return results
 
     async def abatch(self, ops: Iterable[Op]) -> list[Result]:
-        """Execute multiple operations asynchronously."""
-        return self.batch(ops)
+        """Execute multiple operations asynchronously on the writer thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self.batch, list(ops))
+
+    def items(self) -> list[tuple[tuple[str, ...], str, dict]]:
+        """Return (namespace, key, value) for every item of the store."""
+        with self._lock:
+            return list(iter_json_items(self.data))
 
     def _get(self, namespace: tuple[str, ...], key: str) -> Optional[dict]:
         """Retrieve a single item."""
-        ns = self._get_namespace(namespace)
-        return ns.get(key)
+        node = self._find_node(namespace)
+        return node.container[key] if node is not None and key in node.keys else None
 
     # def _put(self, namespace: tuple[str, ...], key: str, value: dict[str, Any]) -> None:
     #     """Store or update an item."""
@@ -59,62 +364,133 @@ class JSONFileStore(BaseStore):
 
     def _put(self, namespace: tuple[str, ...], key: str, value: dict[str, Any]) -> None:
         """Store or update an item without overwriting other items."""
-        ns = self._get_or_create_namespace(namespace)
-
-        # Add or update the key-value pair
-        ns[key] = value
-
-        # Save the updated data to persist the change
-        self._save_data()
+        # Add or update the key-value pair; batch persists the change once for all operations
+        self._set_item(namespace, key, value)
+        if self.wal:
+            self._append_record({"op": "put", "ns": list(namespace), "key": key, "value": value})
         return {"status": "success", "key": key}
 
     def _delete(self, namespace: tuple[str, ...], key: str) -> None:
         """Delete an item."""
-        ns = self._get_namespace(namespace)
-        if key in ns:
-            del ns[key]
+        if self._remove_item(namespace, key):
+            if self.wal:
+                self._append_record({"op": "del", "ns": list(namespace), "key": key})
         return {"status": "deleted", "key": key}
 
     def _search(self, namespace_prefix: tuple[str, ...], filter: Optional[dict] = None, limit: int = 10,
-                offset: int = 0) -> list[dict]:
-        """Search for items within a namespace prefix."""
-        # Navigate to the namespace
-        ns = self.data
-        for part in namespace_prefix:
-            if part in ns:
-                ns = ns[part]
-            else:
-                return []  # Return empty if namespace doesn't exist
+                offset: int = 0, query: Optional[str] = None) -> list[dict]:
+        """Search for items in the namespace prefix and all namespaces below it."""
+        node = self._find_node(namespace_prefix)
+        if node is None:
+            return []  # Return empty if namespace doesn't exist
 
-        # Collect items in the namespace
-        results = []
-        for key, item in ns.items():
-            if isinstance(item, dict):  # Ensure the item is a dictionary
-                if not filter or all(item.get(k) == v for k, v in filter.items()):
-                    results.append({"key": key, "value": item})
+        if query and self._vectors is not None:
+            return self._semantic_search(node, tuple(namespace_prefix), query, filter, limit, offset)
+
+        # Lazily walk the matching items so only offset + limit of them are visited
+        matches = (
+            {"key": key, "value": value}
+            for _, ns_node in node.walk(tuple(namespace_prefix))
+            for key, value in ns_node.matching(filter)
+        )
+        return list(itertools.islice(matches, offset, offset + limit))
 
-        # Apply limit and offset
-        return results[offset: offset + limit]
+    def _semantic_search(self, node: "_NamespaceNode", namespace_prefix: tuple[str, ...], query: str,
+                         filter: Optional[dict], limit: int, offset: int) -> list[dict]:
+        """Rank the items under a namespace node by similarity to the query."""
+        query_vector = self._vectors.embed_query(query)
+        scored = []
+        for namespace, ns_node in node.walk(namespace_prefix):
+            allowed = {key for key, _ in ns_node.matching(filter)} if filter else None
+            for key, score in self._vectors.scores(namespace, query_vector):
+                if allowed is None or key in allowed:
+                    scored.append((score, key, ns_node.container[key]))
+        best = heapq.nlargest(offset + limit, scored, key=lambda entry: entry[0])
+        return [{"key": key, "value": value, "score": score} for score, key, value in best[offset:]]
 
     def _list_namespaces(self, match_conditions, max_depth: Optional[int], limit: int, offset: int) -> list[tuple[str, ...]]:
-        """List namespaces matching conditions."""
-        namespaces = list(self.data.keys())
-        if max_depth:
-            namespaces = [ns[:max_depth] for ns in namespaces]
-        return namespaces[offset : offset + limit]
-
-    def _get_namespace(self, namespace: tuple[str, ...]) -> dict:
-        """Retrieve a namespace."""
-        ns = self.data
+        """List namespaces holding items that match all conditions."""
+        # Start from the deepest node fixed by a wildcard-free leading prefix condition
+        start = ()
+        for condition in match_conditions or ():
+            if condition.match_type == "prefix":
+                fixed = tuple(itertools.takewhile(lambda label: label != "*", condition.path))
+                if len(fixed) > len(start):
+                    start = fixed
+        node = self._find_node(start)
+        if node is None:
+            return []
+
+        namespaces = []
+        seen = set()
+        for namespace, ns_node in node.walk(start):
+            if not ns_node.keys:
+                continue
+            if match_conditions and not all(namespace_matches(namespace, c) for c in match_conditions):
+                continue
+            if max_depth is not None:
+                namespace = namespace[:max_depth]
+            if namespace not in seen:
+                seen.add(namespace)
+                namespaces.append(namespace)
+        return namespaces[offset: offset + limit]
+
+    def _rebuild_index(self):
+        """Build the namespace trie and field indexes from the loaded data."""
+        self._root = self._build_node(self.data, ())
+
+    def _build_node(self, data: dict, namespace: tuple[str, ...]) -> _NamespaceNode:
+        node = _NamespaceNode(data)
+        for key, value in data["items"].items():
+            node.add(key, value)
+            if self._vectors is not None:
+                self._vectors.add(namespace, key, value)
+        for label, child in data["namespaces"].items():
+            node.children[label] = self._build_node(child, namespace + (label,))
+        return node
+
+    def _find_node(self, namespace: tuple[str, ...]) -> Optional[_NamespaceNode]:
+        node = self._root
         for part in namespace:
-            ns = ns.get(part, {})
-        return ns
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
 
-    def _get_or_create_namespace(self, namespace: tuple[str, ...]) -> dict:
-        """Retrieve or create a namespace."""
-        ns = self.data
+    def _get_or_create_node(self, namespace: tuple[str, ...]) -> _NamespaceNode:
+        node = self._root
         for part in namespace:
-            if part not in ns:
-                ns[part] = {}
-            ns = ns[part]
-        return ns
+            child = node.children.get(part)
+            if child is None:
+                data = node.data["namespaces"].setdefault(part, _new_namespace_data())
+                child = node.children[part] = _NamespaceNode(data)
+            node = child
+        return node
+
+    def _set_item(self, namespace: tuple[str, ...], key: str, value: dict[str, Any]):
+        """Store an item in the data and the indexes."""
+        node = self._get_or_create_node(namespace)
+        if key in node.keys:
+            node.remove(key, node.container[key])
+        node.container[key] = value
+        node.add(key, value)
+        if self._vectors is not None:
+            self._vectors.add(namespace, key, value)
+
+    def _remove_item(self, namespace: tuple[str, ...], key: str) -> bool:
+        """Remove an item from the data and the indexes, pruning namespaces left empty."""
+        node = self._find_node(namespace)
+        if node is None or key not in node.keys:
+            return False
+        node.remove(key, node.container.pop(key))
+        if self._vectors is not None:
+            self._vectors.remove(namespace, key)
+        # Prune namespaces left without items, so they are not kept in the file
+        for depth in range(len(namespace), 0, -1):
+            parent = self._find_node(namespace[:depth - 1])
+            child = parent.children[namespace[depth - 1]]
+            if child.container or child.children:
+                break
+            del parent.children[namespace[depth - 1]]
+            parent.data["namespaces"].pop(namespace[depth - 1], None)
+        return True
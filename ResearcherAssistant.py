@@ -1,3 +1,5 @@
+import asyncio
+
 from langchain.memory import ConversationSummaryBufferMemory
 from langchain_ollama import ChatOllama
 from langchain_openai import ChatOpenAI
@@ -41,6 +43,7 @@ while True:
         print("Goodbye!")
         break
     inputs = {"messages": [("user", user_input)]}
-    process_stream(graph.stream(inputs, stream_mode="values", config=config))
+    asyncio.run(process_stream(graph.astream(inputs, stream_mode="updates", config=config),
+                               input_messages=inputs["messages"]))
 
 
@@ -0,0 +1,216 @@
+import asyncio
+import sqlite3
+import threading
+import zlib
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+_CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+_SELECT_CHECKPOINTS = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                       "metadata_type, metadata FROM checkpoints")
+_SELECT_WRITES = ("SELECT task_id, channel, type, value FROM writes "
+                  "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx")
+_INSERT_CHECKPOINT = "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_INSERT_WRITE = "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_REPLACE_WRITE = "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_PRUNE_CHECKPOINTS = """
+DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < (
+    SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+    ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?
+)
+"""
+_PRUNE_WRITES = """
+DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+    SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+)
+"""
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """A LangGraph checkpointer persisting checkpoints in a SQLite database.
+
+    Only the last ``keep_last`` checkpoints of every thread are kept, and checkpoint and write
+    blobs are zlib-compressed. Nothing is held in memory: a thread's state is read from disk
+    only when that thread is resumed.
+    """
+
+    def __init__(self, db_path: str = "checkpoints.db", keep_last: Optional[int] = 20, compression_level: int = 6,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.keep_last = keep_last
+        self.compression_level = compression_level
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_CREATE_TABLES)
+        self._conn.commit()
+
+    def _dumps(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        return type_, zlib.compress(data, self.compression_level)
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        return self.serde.loads_typed((type_, zlib.decompress(data)))
+
+    def _to_tuple(self, row: tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+        writes = self._conn.execute(_SELECT_WRITES, (thread_id, checkpoint_ns, checkpoint_id)).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": checkpoint_id}},
+            checkpoint=self._loads(type_, checkpoint),
+            metadata=self._loads(metadata_type, metadata),
+            parent_config=({"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                             "checkpoint_id": parent_id}} if parent_id else None),
+            pending_writes=[(task_id, channel, self._loads(w_type, value))
+                            for task_id, channel, w_type, value in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get the requested checkpoint of a thread, or its latest one if no checkpoint id is given."""
+        configurable = config["configurable"]
+        params = [configurable["thread_id"], configurable.get("checkpoint_ns", "")]
+        query = _SELECT_CHECKPOINTS + " WHERE thread_id = ? AND checkpoint_ns = ?"
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            return self._to_tuple(row) if row else None
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first, optionally restricted to a thread and filtered by metadata."""
+        conditions, params = [], []
+        if config:
+            conditions.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            params.append(before_id)
+        query = _SELECT_CHECKPOINTS
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            results = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                checkpoint_tuple = self._to_tuple(row)
+                if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                results.append(checkpoint_tuple)
+        yield from results
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        """Save a checkpoint and drop the thread's checkpoints beyond the retention limit."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, data = self._dumps(checkpoint)
+        metadata_type, metadata_data = self._dumps(get_checkpoint_metadata(config, metadata))
+        with self._lock, self._conn:
+            self._conn.execute(_INSERT_CHECKPOINT, (thread_id, checkpoint_ns, checkpoint["id"],
+                                                    config["configurable"].get("checkpoint_id"), type_, data,
+                                                    metadata_type, metadata_data))
+            if self.keep_last:
+                self._conn.execute(_PRUNE_CHECKPOINTS, (thread_id, checkpoint_ns, thread_id, checkpoint_ns,
+                                                        self.keep_last - 1))
+                self._conn.execute(_PRUNE_WRITES, (thread_id, checkpoint_ns, thread_id, checkpoint_ns))
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        """Save the pending writes of a task for a checkpoint."""
+        configurable = config["configurable"]
+        # Special writes (errors, interrupts, ...) replace earlier ones; regular writes are kept once
+        query = _REPLACE_WRITE if all(channel in WRITES_IDX_MAP for channel, _ in writes) else _INSERT_WRITE
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, data = self._dumps(value)
+            rows.append((configurable["thread_id"], configurable.get("checkpoint_ns", ""),
+                         configurable["checkpoint_id"], task_id, WRITES_IDX_MAP.get(channel, idx), channel, type_,
+                         data, task_path))
+        with self._lock, self._conn:
+            self._conn.executemany(query, rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and writes of a thread."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None,
+                    limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for checkpoint_tuple in results:
+            yield checkpoint_tuple
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,275 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Any, Optional
+
+import numpy as np
+from langgraph.store.base import BaseStore, Op, Result, GetOp, PutOp, SearchOp, ListNamespacesOp
+from JsonFileStore import JSONFileStore, namespace_matches
+from VectorIndex import HashingEmbedder, embed_texts, item_text, top_k
+
+# Namespace labels are joined with the ASCII unit separator, which never appears in regular labels.
+# Every namespace under a prefix then sorts between "<prefix><SEP>" and "<prefix><SEP + 1>".
+NAMESPACE_SEPARATOR = "\x1f"
+_NAMESPACE_UPPER_BOUND = chr(ord(NAMESPACE_SEPARATOR) + 1)
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS store (
+    prefix TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    embedding BLOB,
+    PRIMARY KEY (prefix, key)
+)
+"""
+_ADD_EMBEDDING_COLUMN = "ALTER TABLE store ADD COLUMN embedding BLOB"
+_GET = "SELECT value FROM store WHERE prefix = ? AND key = ?"
+_UPSERT = """
+INSERT INTO store (prefix, key, value, created_at, updated_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(prefix, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at, embedding = NULL
+"""
+_INSERT_IGNORE = "INSERT OR IGNORE INTO store (prefix, key, value, created_at, updated_at) VALUES (?, ?, ?, ?, ?)"
+_DELETE = "DELETE FROM store WHERE prefix = ? AND key = ?"
+_PREFIX_CONDITION = "(prefix = ? OR (prefix > ? AND prefix < ?))"
+_SET_EMBEDDING = "UPDATE store SET embedding = ? WHERE prefix = ? AND key = ?"
+_LIST_NAMESPACES = "SELECT DISTINCT prefix FROM store ORDER BY prefix"
+
+
+def _encode_namespace(namespace: tuple[str, ...]) -> str:
+    return NAMESPACE_SEPARATOR.join(namespace)
+
+
+def _decode_namespace(prefix: str) -> tuple[str, ...]:
+    return tuple(prefix.split(NAMESPACE_SEPARATOR)) if prefix else ()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SQLiteStore(BaseStore):
+    """A store backed by a SQLite database, keyed by (namespace, key).
+
+    Drop-in replacement for JSONFileStore: results have the same shape, but every
+    ``batch`` runs in a single transaction and writes touch only the affected rows.
+
+    With ``index`` (``{"embed": ..., "fields": [...]}``, both optional) ``SearchOp.query`` ranks items
+    by cosine similarity. Embeddings are computed lazily on the first query after a write (or with
+    embed_pending) and kept in the ``embedding`` column.
+    """
+
+    EMBED_BATCH_SIZE = 256
+    SCORE_BATCH_SIZE = 4096
+
+    def __init__(self, db_path: str = "store.db", index: Optional[dict] = None):
+        self.db_path = db_path
+        self.embed = (index.get("embed") or HashingEmbedder()) if index is not None else None
+        self.index_fields = index.get("fields") if index is not None else None
+        self._lock = threading.RLock()
+        # sqlite3 caches compiled statements per connection, so the constant queries below are prepared once
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_CREATE_TABLE)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(store)")]
+        if "embedding" not in columns:
+            self._conn.execute(_ADD_EMBEDDING_COLUMN)
+        self._conn.commit()
+
+    def batch(self, ops: Iterable[Op]) -> list[Result]:
+        """Execute multiple operations synchronously in a single transaction."""
+        results = []
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            for op in ops:
+                if isinstance(op, GetOp):
+                    results.append(self._get(cursor, op.namespace, op.key))
+                elif isinstance(op, PutOp):
+                    if op.value is None:
+                        results.append(self._delete(cursor, op.namespace, op.key))
+                    else:
+                        results.append(self._put(cursor, op.namespace, op.key, op.value))
+                elif isinstance(op, SearchOp):
+                    results.append(self._search(cursor, op.namespace_prefix, op.filter, op.limit, op.offset,
+                                                op.query))
+                elif isinstance(op, ListNamespacesOp):
+                    results.append(self._list_namespaces(cursor, op.match_conditions, op.max_depth, op.limit,
+                                                         op.offset))
+                else:
+                    raise ValueError(f"Unsupported operation type: {type(op)}")
+        return results
+
+    async def abatch(self, ops: Iterable[Op]) -> list[Result]:
+        """Execute multiple operations asynchronously."""
+        return await asyncio.to_thread(self.batch, list(ops))
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, cursor: sqlite3.Cursor, namespace: tuple[str, ...], key: str) -> Optional[dict]:
+        """Retrieve a single item."""
+        row = cursor.execute(_GET, (_encode_namespace(namespace), key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put(self, cursor: sqlite3.Cursor, namespace: tuple[str, ...], key: str, value: dict[str, Any]) -> dict:
+        """Store or update an item."""
+        now = _now()
+        cursor.execute(_UPSERT, (_encode_namespace(namespace), key, json.dumps(value), now, now))
+        return {"status": "success", "key": key}
+
+    def _delete(self, cursor: sqlite3.Cursor, namespace: tuple[str, ...], key: str) -> dict:
+        """Delete an item."""
+        cursor.execute(_DELETE, (_encode_namespace(namespace), key))
+        return {"status": "deleted", "key": key}
+
+    def _search(self, cursor: sqlite3.Cursor, namespace_prefix: tuple[str, ...], filter: Optional[dict] = None,
+                limit: int = 10, offset: int = 0, query: Optional[str] = None) -> list[dict]:
+        """Search for items in the namespace prefix and all namespaces below it."""
+        conditions, params = [], []
+        if namespace_prefix:
+            prefix = _encode_namespace(namespace_prefix)
+            conditions.append(_PREFIX_CONDITION)
+            params += [prefix, prefix + NAMESPACE_SEPARATOR, prefix + _NAMESPACE_UPPER_BOUND]
+        python_filter = {}
+        for field, expected in (filter or {}).items():
+            if isinstance(expected, (str, int, float)) and not isinstance(expected, bool):
+                conditions.append("json_extract(value, ?) = ?")
+                params += [f'$."{field}"', expected]
+            else:
+                python_filter[field] = expected
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+        if query and self.embed is not None:
+            return self._semantic_search(cursor, where, params, python_filter, query, limit, offset)
+
+        select = f"SELECT key, value FROM store{where} ORDER BY rowid"
+        if not python_filter:
+            rows = cursor.execute(select + " LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+            return [{"key": key, "value": json.loads(value)} for key, value in rows]
+
+        results = []
+        for key, value in cursor.execute(select, params):
+            item = json.loads(value)
+            if all(item.get(k) == v for k, v in python_filter.items()):
+                results.append({"key": key, "value": item})
+        return results[offset: offset + limit]
+
+    def embed_pending(self, namespace_prefix: tuple[str, ...] = ()):
+        """Embed the items under a namespace prefix that have no embedding yet, instead of on the next query."""
+        if self.embed is None:
+            return
+        where, params = "", []
+        if namespace_prefix:
+            prefix = _encode_namespace(namespace_prefix)
+            where, params = " WHERE " + _PREFIX_CONDITION, [prefix, prefix + NAMESPACE_SEPARATOR,
+                                                            prefix + _NAMESPACE_UPPER_BOUND]
+        with self._lock, self._conn:
+            self._embed_pending(self._conn.cursor(), where, params)
+
+    def _embed_pending(self, cursor: sqlite3.Cursor, where: str, params: list):
+        """Embed the items matching the where clause that have no embedding, EMBED_BATCH_SIZE at a time."""
+        pending_condition = (where + " AND " if where else " WHERE ") + "embedding IS NULL"
+        while True:
+            pending = cursor.execute(f"SELECT prefix, key, value FROM store{pending_condition} LIMIT ?",
+                                     params + [self.EMBED_BATCH_SIZE]).fetchall()
+            if not pending:
+                return
+            vectors = embed_texts(self.embed, [item_text(json.loads(value), self.index_fields)
+                                               for _, _, value in pending])
+            cursor.executemany(_SET_EMBEDDING, [(vector.tobytes(), prefix, key)
+                                                for vector, (prefix, key, _) in zip(vectors, pending)])
+
+    def _semantic_search(self, cursor: sqlite3.Cursor, where: str, params: list, python_filter: dict, query: str,
+                         limit: int, offset: int) -> list[dict]:
+        """
+        Rank the items matching the where clause by similarity to the query.
+
+        Embeddings are scored SCORE_BATCH_SIZE rows at a time while only the best candidates are kept, and
+        values are read for the returned items alone, so memory does not grow with the number of items.
+        """
+        self._embed_pending(cursor, where, params)
+        query_vector = embed_texts(self.embed, [query], is_query=True)[0]
+        k = offset + limit
+        columns = "prefix, key, embedding, value" if python_filter else "prefix, key, embedding"
+        rows = cursor.execute(f"SELECT {columns} FROM store{where}", params)
+        candidates = []  # (score, prefix, key) of the best rows so far, best first
+        while True:
+            batch = rows.fetchmany(self.SCORE_BATCH_SIZE)
+            if not batch:
+                break
+            if python_filter:
+                batch = [row for row in batch
+                         if all(json.loads(row[3]).get(f) == v for f, v in python_filter.items())]
+                if not batch:
+                    continue
+            scores = np.stack([np.frombuffer(row[2], dtype=np.float32) for row in batch]) @ query_vector
+            candidates += [(float(scores[i]), batch[i][0], batch[i][1]) for i in top_k(scores, k)]
+            # sorted() is stable, so ties keep the row order
+            candidates = sorted(candidates, key=lambda candidate: -candidate[0])[:k]
+
+        results = []
+        for score, prefix, key in candidates[offset:]:
+            value = cursor.execute(_GET, (prefix, key)).fetchone()[0]
+            results.append({"key": key, "value": json.loads(value), "score": score})
+        return results
+
+    def _list_namespaces(self, cursor: sqlite3.Cursor, match_conditions, max_depth: Optional[int], limit: int,
+                         offset: int) -> list[tuple[str, ...]]:
+        """List namespaces matching conditions."""
+        namespaces = []
+        seen = set()
+        for (prefix,) in cursor.execute(_LIST_NAMESPACES):
+            namespace = _decode_namespace(prefix)
+            if match_conditions and not all(namespace_matches(namespace, c) for c in match_conditions):
+                continue
+            if max_depth is not None:
+                namespace = namespace[:max_depth]
+            if namespace not in seen:
+                seen.add(namespace)
+                namespaces.append(namespace)
+        return namespaces[offset: offset + limit]
+
+
+def migrate_json_store(json_path: str, db_path: str) -> int:
+    """
+    One-shot migration of a JSONFileStore file (including a pending write-ahead log) into a SQLiteStore.
+
+    Rows that already exist in the database are left untouched, so running it twice is harmless.
+
+    Args:
+        json_path (str): Path of the existing JSON store file.
+        db_path (str): Path of the SQLite database to populate.
+
+    Returns:
+        int: Number of items copied.
+    """
+    json_store = JSONFileStore(file_path=json_path, wal=os.path.exists(f"{json_path}.wal"))
+    sqlite_store = SQLiteStore(db_path=db_path)
+    migrated = 0
+    try:
+        with sqlite_store._lock, sqlite_store._conn:
+            now = _now()
+            for namespace, key, value in json_store.items():
+                cursor = sqlite_store._conn.execute(_INSERT_IGNORE, (_encode_namespace(namespace), key,
+                                                                     json.dumps(value), now, now))
+                migrated += cursor.rowcount
+    finally:
+        sqlite_store.close()
+        json_store.close()
+    return migrated
+
+
+# Example Usage
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "data_store.json"
+    target = sys.argv[2] if len(sys.argv) > 2 else "data_store.db"
+    count = migrate_json_store(source, target)
+    print(f"Migrated {count} items from {source} to {target}.")
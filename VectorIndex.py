@@ -0,0 +1,135 @@
+import re
+import zlib
+from typing import Any, Callable, Iterable, Optional, Union
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """A local, dependency-free embedding: hashed word unigrams and bigrams projected to a fixed dimension."""
+
+    def __init__(self, dims: int = 1024):
+        self.dims = dims
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dims), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN_PATTERN.findall(text.lower())
+            for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                # crc32 is stable across processes, unlike the salted built-in hash()
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dims] += 1.0 if h & 0x80000000 else -1.0
+        return vectors
+
+
+EmbedFunc = Union[Embeddings, Callable[[list[str]], Any]]
+
+
+def embed_texts(embed: EmbedFunc, texts: list[str], is_query: bool = False) -> np.ndarray:
+    """Embed texts with either a LangChain Embeddings model or a callable and L2-normalize the rows."""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    if isinstance(embed, Embeddings):
+        raw = [embed.embed_query(texts[0])] if is_query and len(texts) == 1 else embed.embed_documents(texts)
+    else:
+        raw = embed(texts)
+    vectors = np.asarray(raw, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def item_text(value: dict, fields: Optional[list[str]] = None) -> str:
+    """The text of an item to embed: the given fields, or every string field of the value."""
+    if fields:
+        parts = [value.get(field) for field in fields]
+    else:
+        parts = list(value.values())
+    return " ".join(str(part) for part in parts if isinstance(part, str) and part)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if k <= 0 or scores.size == 0:
+        return np.zeros(0, dtype=int)
+    if k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class VectorIndex:
+    """An in-memory, brute-force cosine similarity index over store items, grouped by namespace.
+
+    Items are embedded lazily: ``add`` only records the text, and pending texts are embedded in a
+    single call the next time the namespace is queried, so writes never wait for the embedder.
+    """
+
+    def __init__(self, embed: Optional[EmbedFunc] = None, fields: Optional[list[str]] = None):
+        self.embed = embed or HashingEmbedder()
+        self.fields = fields
+        self._namespaces = {}  # namespace -> {"keys": list, "rows": dict, "matrix": ndarray, "pending": dict}
+
+    def add(self, namespace: tuple[str, ...], key: str, value: dict):
+        entry = self._namespaces.setdefault(namespace, {"keys": [], "rows": {}, "matrix": None, "pending": {}})
+        self._drop_row(entry, key)
+        entry["pending"][key] = item_text(value, self.fields)
+
+    def remove(self, namespace: tuple[str, ...], key: str):
+        entry = self._namespaces.get(namespace)
+        if entry is None:
+            return
+        entry["pending"].pop(key, None)
+        self._drop_row(entry, key)
+
+    def scores(self, namespace: tuple[str, ...], query_vector: np.ndarray) -> Iterable[tuple[str, float]]:
+        """Yield (key, cosine similarity) for every item of the namespace."""
+        entry = self._namespaces.get(namespace)
+        if entry is None:
+            return []
+        self._embed_pending(entry)
+        if not entry["keys"]:
+            return []
+        similarities = entry["matrix"][:len(entry["keys"])] @ query_vector
+        return zip(entry["keys"], similarities.tolist())
+
+    def embed_query(self, query: str) -> np.ndarray:
+        return embed_texts(self.embed, [query], is_query=True)[0]
+
+    @staticmethod
+    def _drop_row(entry: dict, key: str):
+        """Remove a key's row by moving the last row into its place."""
+        row = entry["rows"].pop(key, None)
+        if row is None:
+            return
+        last = len(entry["keys"]) - 1
+        if row != last:
+            moved_key = entry["keys"][last]
+            entry["keys"][row] = moved_key
+            entry["matrix"][row] = entry["matrix"][last]
+            entry["rows"][moved_key] = row
+        entry["keys"].pop()
+
+    def _embed_pending(self, entry: dict):
+        if not entry["pending"]:
+            return
+        keys = list(entry["pending"])
+        vectors = embed_texts(self.embed, [entry["pending"][key] for key in keys])
+        entry["pending"].clear()
+        count = len(entry["keys"])
+        matrix = entry["matrix"]
+        if matrix is None or matrix.shape[1] != vectors.shape[1]:
+            matrix = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        if count + len(keys) > matrix.shape[0]:
+            # Grow geometrically so repeated small additions stay amortized O(1)
+            grown = np.zeros((max(2 * matrix.shape[0], count + len(keys)), vectors.shape[1]), dtype=np.float32)
+            grown[:count] = matrix[:count]
+            matrix = grown
+        matrix[count:count + len(keys)] = vectors
+        entry["matrix"] = matrix
+        for offset, key in enumerate(keys):
+            entry["rows"][key] = count + offset
+            entry["keys"].append(key)
@@ -1,5 +1,7 @@
 import streamlit as st
 import asyncio
+import queue
+import threading
 
 from langchain_openai import AzureChatOpenAI
 from langchain_core.messages import ToolMessage
@@ -11,12 +13,18 @@ import streamlit_authenticator as stauth
 from conversation_manager import ConversationManager
 from conversation_history_manager import ConversationHistoryManager
 from personal_assistant import PersonalAssistant
+from tool_registry import shared_resources
 from sentinel import LLMSecretDetector
 from sentinel.wrappers import instrument_model_class
 
 # Load environment variables
 load_dotenv()
 
+# Number of saved conversations listed in the sidebar per page
+THREADS_PAGE_SIZE = 20
+# Number of turns of a saved conversation rendered when it is opened or paged back
+TURNS_PAGE_SIZE = 20
+
 # Load authentication config
 with open('config.yaml') as file:
     config = yaml.safe_load(file)
@@ -55,13 +63,18 @@ if "assistant" not in st.session_state:
 if "conversation" not in st.session_state:
     st.session_state.conversation = ConversationManager(st.session_state.assistant)
 
-conversation_history_manager = ConversationHistoryManager(llm=llm)
+if "conversation_history_manager" not in st.session_state:
+    st.session_state.conversation_history_manager = ConversationHistoryManager(llm=llm, compress=True)
+
+if "threads_shown" not in st.session_state:
+    st.session_state.threads_shown = THREADS_PAGE_SIZE
+
+conversation_history_manager = st.session_state.conversation_history_manager
 conversation = st.session_state.conversation
 
 selected_thread_id = None  # define this at top of sidebar block
 
 assistant = st.session_state.assistant
-thread_ids = conversation_history_manager.list_threads(username)
 
 with st.sidebar:
 
@@ -90,19 +103,30 @@ with st.sidebar:
             conversation_history_manager.save_conversation(st.session_state.conversation)
             st.rerun()
 
-    if thread_ids:
-        thread_map = {tid: conversation_history_manager.get_summary(user_id=username, thread_id=tid) for tid in
-                      thread_ids}
-        friendly_names = list(thread_map.values())
+    search_query = st.text_input("Search conversations", key="thread_search", placeholder="🔍 Search conversations",
+                                 label_visibility="collapsed")
+    if search_query.strip():
+        thread_entries = conversation_history_manager.search(username, search_query, limit=THREADS_PAGE_SIZE)
+        if not thread_entries:
+            st.caption("No matching conversations.")
+    else:
+        # Read from the thread index, most recently updated first, without opening conversation files
+        thread_entries = conversation_history_manager.list_thread_entries(username,
+                                                                          limit=st.session_state.threads_shown)
 
-        for thread_id in thread_ids:
+    if thread_entries:
+        for entry in thread_entries:
+            thread_id = entry["thread_id"]
             cols = st.columns([0.6, 0.1, 0.1])
             with cols[0]:
-                st.markdown(f"🧵 {thread_map[thread_id]}")
+                st.markdown(f"🧵 {entry['summary'] or thread_id}")
+                if entry.get("snippet"):
+                    st.caption(entry["snippet"])
             with cols[1]:
                 if st.button("📂", key=f"load_{thread_id}"):
                     selected_thread_id = thread_id
-                    loaded_convo = conversation_history_manager.load(assistant, username, selected_thread_id)
+                    loaded_convo = conversation_history_manager.load(assistant, username, selected_thread_id,
+                                                                     last_n=TURNS_PAGE_SIZE)
                     st.session_state.conversation = loaded_convo
                     st.rerun()
             with cols[2]:
@@ -110,6 +134,12 @@ with st.sidebar:
                     conversation_history_manager.delete_conversation(username, thread_id)
                     st.rerun()
 
+        if not search_query.strip() and \
+                conversation_history_manager.count_threads(username) > st.session_state.threads_shown:
+            if st.button("Show more", key="show_more_threads"):
+                st.session_state.threads_shown += THREADS_PAGE_SIZE
+                st.rerun()
+
 
 # Main content area for chat panel
 chat_container = st.container(border=False, key='chat')
@@ -149,6 +179,10 @@ def handle_chat_widget_content(turn, uploaded_files=None):
 
 # Use the chat container to render the chat widget content
 with chat_container:
+    if conversation.turn_offset > 0:
+        if st.button(f"Load earlier messages ({conversation.turn_offset} more)", key="load_earlier"):
+            conversation_history_manager.load_earlier(conversation, limit=TURNS_PAGE_SIZE)
+            st.rerun()
     for turn in conversation.conversation_messages:
         handle_chat_widget_content(turn)
 
@@ -166,15 +200,46 @@ if prompt:
     handle_chat_widget_content(user_message)
 
 
-    # Run assistant
-    async def process_input(prompt_text, uploaded_files, handle_chat_content):
-        response_turn = await st.session_state.conversation.process_input(
-            prompt_text, uploaded_files, lambda msg: None  # we handle all output below
-        )
-        if response_turn is None:
-            conversation_history_manager.save_conversation(st.session_state.conversation)
-        else:
-            handle_chat_content(response_turn, uploaded_files)
-
-
-    asyncio.run(process_input(user_text, uploaded_files, handle_chat_widget_content))
+    # Run the assistant in a worker thread and stream its events to the chat widget as they arrive
+    events = queue.Queue()
+    active_conversation = st.session_state.conversation
+
+    async def run_turn():
+        try:
+            return await active_conversation.process_input(
+                user_text, uploaded_files, lambda msg: None, event_hook=events.put)
+        finally:
+            # The browser is bound to this turn's event loop, which asyncio.run closes on return
+            await shared_resources.close_browser()
+
+    def run_assistant():
+        try:
+            turn = asyncio.run(run_turn())
+            events.put({"type": "done", "turn": turn})
+        except Exception as e:
+            events.put({"type": "error", "error": e})
+
+    threading.Thread(target=run_assistant, daemon=True).start()
+    outcome = {}
+
+    def stream_response():
+        while True:
+            event = events.get()
+            if event["type"] == "token":
+                yield event["content"]
+            elif event["type"] == "tool_call":
+                yield f"\n\n**Tool:** {event['name']} | **Arguments:** {event['args']}\n\n"
+            elif event["type"] in ("done", "error"):
+                outcome.update(event)
+                return
+
+    with chat_container.chat_message("assistant"):
+        st.write_stream(stream_response())
+
+    if outcome["type"] == "error":
+        st.error(f"Failed to process the message: {outcome['error']}")
+    elif outcome["turn"] is None:
+        conversation_history_manager.save_conversation(active_conversation)
+    else:
+        # Re-render from the conversation so that tool responses are shown in their expanders
+        st.rerun()
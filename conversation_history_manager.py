@@ -1,21 +1,268 @@
 import os
+import gzip
 import json
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from langchain_core.messages import messages_to_dict, messages_from_dict
-from typing import List
+from typing import List, Iterator, Optional
 from conversation_manager import ConversationManager
 from personal_assistant import PersonalAssistant
 
+_CREATE_SEARCH_TABLES = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages USING fts5(
+    content, user_id UNINDEXED, thread_id UNINDEXED, turn UNINDEXED
+);
+CREATE TABLE IF NOT EXISTS indexed_threads (
+    user_id TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    turns INTEGER NOT NULL,
+    PRIMARY KEY (user_id, thread_id)
+);
+"""
+
 
 class ConversationHistoryManager:
-    def __init__(self, base_directory="conversations", llm=None):
+    """
+    Persists conversations as one JSONL file per thread.
+
+    The first line is a header record with the thread metadata, each following line holds one turn,
+    and later metadata changes are appended as "meta" records. Saving a conversation only appends
+    the turns that are not on disk yet. Legacy single-JSON files are still read and are converted
+    the next time they are saved.
+
+    Each user directory also holds an ``index.json`` with one entry per thread (summary, created and
+    updated timestamps, turn count and byte size), maintained on save and delete, so listing
+    threads never opens a conversation file.
+
+    Summaries are generated by a background worker from the first few turns of a thread, so saving
+    never waits for the LLM; the summary is appended as a "meta" record once it is ready.
+
+    With ``compress=True`` new threads are written as ``.jsonl.gz`` files, one gzip member per
+    append; both formats are read transparently. Tool outputs larger than ``blob_threshold``
+    characters are stored out of line as gzip-compressed, content-addressed blobs shared by all
+    threads, so the same PDF or web page is stored once. Blobs are never deleted with a thread.
+
+    User and assistant messages and thread summaries are also added to a SQLite FTS5 index as they
+    are saved, so ``search`` finds threads by content without opening any conversation file.
+    """
+
+    INDEX_FILE = "index.json"
+
+    # Records are written with "type" as their first key, so turn lines can be recognized without parsing
+    TURN_PREFIX = '{"type": "turn"'
+
+    # Number of leading turns a summary is generated from, and number of summaries kept in memory
+    SUMMARY_TURNS = 3
+    SUMMARY_CACHE_SIZE = 256
+
+    BLOBS_DIR = ".blobs"
+    SEARCH_DB = "search.db"
+
+    def __init__(self, base_directory="conversations", llm=None, compress: bool = False,
+                 blob_threshold: Optional[int] = 16 * 1024):
         self.base_directory = base_directory
         self.llm = llm
+        self.compress = compress
+        self.blob_threshold = blob_threshold
         os.makedirs(self.base_directory, exist_ok=True)
+        self._indexes = {}  # user id -> (index file mtime, {thread id: entry})
+        # Guards conversation file appends and index writes shared with the summary worker
+        self._lock = threading.RLock()
+        self._summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-summary")
+        self._summary_cache = OrderedDict()  # hash of the summarized turns -> summary
+        self._pending_summaries = set()  # (user id, thread id) with a summary being generated
+        self._search_db = sqlite3.connect(os.path.join(self.base_directory, self.SEARCH_DB), check_same_thread=False)
+        self._search_db.execute("PRAGMA journal_mode=WAL")
+        self._search_db.executescript(_CREATE_SEARCH_TABLES)
+        self._search_synced = set()  # user ids whose threads were checked against the search index
 
-    def _get_file_path(self, user_id: str, thread_id: str) -> str:
+    def _get_user_dir(self, user_id: str) -> str:
         user_dir = os.path.join(self.base_directory, str(user_id))
         os.makedirs(user_dir, exist_ok=True)
-        return os.path.join(user_dir, f"{thread_id}.json")
+        return user_dir
+
+    def _get_file_path(self, user_id: str, thread_id: str) -> str:
+        """The thread's conversation file: the existing one, else a new one in the configured format."""
+        path = os.path.join(self._get_user_dir(user_id), f"{thread_id}.jsonl")
+        compressed_path = f"{path}.gz"
+        if os.path.exists(compressed_path) or (self.compress and not os.path.exists(path)):
+            return compressed_path
+        return path
+
+    def _get_legacy_file_path(self, user_id: str, thread_id: str) -> str:
+        return os.path.join(self._get_user_dir(user_id), f"{thread_id}.json")
+
+    @staticmethod
+    def _open(file_path: str, mode: str):
+        """Open a conversation file in text mode, decompressing .gz files."""
+        if file_path.endswith(".gz"):
+            return gzip.open(file_path, mode + "t", encoding="utf-8")
+        return open(file_path, mode, encoding="utf-8")
+
+    @classmethod
+    def _read_lines(cls, file_path: str) -> Iterator[str]:
+        """Stream the lines of a conversation file, stopping at a torn gzip member."""
+        with cls._open(file_path, "r") as f:
+            try:
+                yield from f
+            except (EOFError, gzip.BadGzipFile):
+                print(f"[Warning] Conversation file is truncated: {file_path}")
+
+    @classmethod
+    def _read_records(cls, file_path: str) -> Iterator[dict]:
+        """Stream the records of a JSONL conversation file, skipping a torn last line."""
+        for line in cls._read_lines(file_path):
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+    @staticmethod
+    def _read_lines_reversed(file_path: str, block_size: int = 64 * 1024) -> Iterator[str]:
+        """Stream the lines of a file from last to first, reading it backwards in blocks."""
+        with open(file_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b""
+            while position > 0:
+                read = min(block_size, position)
+                position -= read
+                f.seek(position)
+                lines = (f.read(read) + remainder).split(b"\n")
+                remainder = lines.pop(0)  # Possibly incomplete; completed by the next block
+                for line in reversed(lines):
+                    if line:
+                        yield line.decode("utf-8")
+            if remainder:
+                yield remainder.decode("utf-8")
+
+    def _read_turns(self, file_path: str, skip_last: int = 0, limit: Optional[int] = None) -> List[dict]:
+        """
+        Read serialized turns from the end of a JSONL file without loading the whole file.
+
+        Args:
+            file_path (str): The conversation file.
+            skip_last (int): Number of most recent turns to skip.
+            limit (Optional[int]): Maximum number of turns to return; all remaining turns when None.
+
+        Returns:
+            List[dict]: The serialized turns, oldest first.
+        """
+        if file_path.endswith(".gz"):
+            # Compressed files cannot be read backwards: stream forward, keeping only the lines needed
+            keep = None if limit is None else skip_last + limit
+            lines = reversed(deque((line for line in self._read_lines(file_path)
+                                    if line.startswith(self.TURN_PREFIX)), maxlen=keep))
+        else:
+            lines = self._read_lines_reversed(file_path)
+        turns = []
+        skipped = 0
+        for line in lines:
+            if limit is not None and len(turns) >= limit:
+                break
+            if not line.startswith(self.TURN_PREFIX):
+                continue
+            if skipped < skip_last:
+                skipped += 1
+                continue
+            try:
+                turns.append(json.loads(line)["messages"])
+            except json.JSONDecodeError:
+                continue  # Torn last line from an interrupted append
+        turns.reverse()
+        return turns
+
+    @staticmethod
+    def _read_legacy(file_path: str) -> dict:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        if isinstance(raw, dict) and "messages" in raw:
+            return raw
+        return {"summary": None, "messages": raw}
+
+    def _scan_file(self, file_path: str, thread_id: str) -> dict:
+        """Build the index entry of a conversation file by reading it."""
+        stat = os.stat(file_path)
+        modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+        entry = {"thread_id": thread_id, "summary": None, "created_at": modified, "updated_at": modified,
+                 "turns": 0, "bytes": stat.st_size}
+        if file_path.endswith(".json"):
+            legacy = self._read_legacy(file_path)
+            entry.update(summary=legacy.get("summary"), turns=len(legacy["messages"]))
+            return entry
+        for record in self._read_records(file_path):
+            if record.get("type") == "turn":
+                entry["turns"] += 1
+            elif record.get("type") == "header":
+                entry["created_at"] = record.get("created_at") or modified
+            if record.get("summary"):
+                entry["summary"] = record["summary"]
+        return entry
+
+    def _get_index_path(self, user_id: str) -> str:
+        return os.path.join(self._get_user_dir(user_id), self.INDEX_FILE)
+
+    def _load_index(self, user_id: str) -> dict:
+        """Return the thread index of a user, rebuilding it from the conversation files if it is missing."""
+        index_path = self._get_index_path(user_id)
+        try:
+            mtime = os.path.getmtime(index_path)
+        except FileNotFoundError:
+            return self._rebuild_index(user_id)
+        cached = self._indexes.get(user_id)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return self._rebuild_index(user_id)
+        self._indexes[user_id] = (mtime, index)
+        return index
+
+    def _rebuild_index(self, user_id: str) -> dict:
+        user_dir = self._get_user_dir(user_id)
+        index = {}
+        for f in sorted(os.listdir(user_dir)):
+            if f == self.INDEX_FILE:
+                continue
+            if f.endswith(".jsonl"):
+                thread_id = f[:-6]
+            elif f.endswith(".jsonl.gz"):
+                thread_id = f[:-9]
+            elif f.endswith(".json"):
+                thread_id = f[:-5]
+                if thread_id in index:
+                    continue  # The JSONL file supersedes a legacy one
+            else:
+                continue
+            try:
+                index[thread_id] = self._scan_file(os.path.join(user_dir, f), thread_id)
+            except Exception as e:
+                print(f"[Warning] Failed to index conversation file {f}: {e}")
+        self._write_index(user_id, index)
+        return index
+
+    def _write_index(self, user_id: str, index: dict):
+        """Atomically replace the index file of a user."""
+        index_path = self._get_index_path(user_id)
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+        self._indexes[user_id] = (os.path.getmtime(index_path), index)
+
+    def _get_entry(self, user_id: str, thread_id: str, file_path: str) -> dict:
+        """Return the index entry of a thread, rescanning the file if the index is out of date."""
+        index = self._load_index(user_id)
+        entry = index.get(thread_id)
+        if entry is None or entry["bytes"] != os.path.getsize(file_path):
+            entry = index[thread_id] = self._scan_file(file_path, thread_id)
+        return entry
 
     def save_conversation(self, conversation: ConversationManager):
         """
@@ -27,22 +274,264 @@ class ConversationHistoryManager:
         user_id = conversation.personal_assistant.user
         thread_id = conversation.thread_id
         messages = conversation.conversation_messages
-        self.save(user_id, thread_id, messages)
+        self.save(user_id, thread_id, messages, start_turn=conversation.turn_offset)
+
+    def save(self, user_id: str, thread_id: str, messages: List[List], start_turn: int = 0):
+        """
+        Append the turns of a conversation that are not on disk yet.
+
+        Args:
+            user_id (str): The ID of the user.
+            thread_id (str): The ID of the conversation thread.
+            messages (List[List]): The turns held in memory.
+            start_turn (int): Position of messages[0] in the whole conversation, for partially loaded threads.
+        """
+        with self._lock:
+            needs_summary = self._save(user_id, thread_id, messages, start_turn)
+        # Only the opening turns are summarized, so a loaded tail of an older thread cannot be used
+        if needs_summary and start_turn == 0:
+            self._schedule_summary(user_id, thread_id, messages[:self.SUMMARY_TURNS])
 
-    def save(self, user_id: str, thread_id: str, messages: List[List]):
+    def _save(self, user_id: str, thread_id: str, messages: List[List], start_turn: int) -> bool:
+        """Append the new turns and update the index; return True if the thread still needs a summary."""
         file_path = self._get_file_path(user_id, thread_id)
-        serialized = [messages_to_dict(turn) for turn in messages]
+        legacy_path = self._get_legacy_file_path(user_id, thread_id)
+
+        if not os.path.exists(file_path):
+            summary, legacy_turns = None, []
+            if os.path.exists(legacy_path):
+                legacy = self._read_legacy(legacy_path)
+                summary, legacy_turns = legacy.get("summary"), legacy["messages"]
+            header = {"type": "header", "thread_id": thread_id, "summary": summary,
+                      "created_at": datetime.now(timezone.utc).isoformat()}
+            # A legacy thread is converted whole, since the caller may hold only its last turns; the file is
+            # written under a temporary name so the legacy file is never deleted before its copy is complete
+            legacy_records = [{"type": "turn", "messages": self._store_blobs(turn)} for turn in legacy_turns]
+            tmp_path = f"{file_path}.tmp"
+            with (gzip.open(tmp_path, "wt", encoding="utf-8") if file_path.endswith(".gz")
+                  else open(tmp_path, "w", encoding="utf-8")) as f:
+                f.write("".join(json.dumps(record) + "\n" for record in [header] + legacy_records))
+            os.replace(tmp_path, file_path)
+            self._index_turns(user_id, thread_id, 0, [record["messages"] for record in legacy_records])
+            self._load_index(user_id)[thread_id] = {
+                "thread_id": thread_id, "summary": summary, "created_at": header["created_at"],
+                "updated_at": header["created_at"], "turns": len(legacy_records),
+                "bytes": os.path.getsize(file_path)}
+
+        entry = self._get_entry(user_id, thread_id, file_path)
+        new_turns = messages[max(entry["turns"] - start_turn, 0):]
+        records = [{"type": "turn", "messages": self._store_blobs(messages_to_dict(turn))} for turn in new_turns]
+        self._index_turns(user_id, thread_id, entry["turns"], [record["messages"] for record in records])
+
+        if records:
+            with self._open(file_path, "a") as f:
+                f.write("".join(json.dumps(record) + "\n" for record in records))
+            entry["turns"] += len(new_turns)
+            entry["updated_at"] = datetime.now(timezone.utc).isoformat()
+        entry["bytes"] = os.path.getsize(file_path)
+        self._write_index(user_id, self._load_index(user_id))
 
-        # Create a summary (e.g., from first user or assistant message)
-        summary = self._generate_summary(messages)
+        # The legacy file is superseded once its turns are in the JSONL file
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+        return not entry["summary"] and bool(messages)
 
-        data = {
-            "summary": summary,
-            "messages": serialized
-        }
+    def _get_blob_path(self, digest: str) -> str:
+        return os.path.join(self.base_directory, self.BLOBS_DIR, digest[:2], f"{digest}.gz")
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+    def _store_blobs(self, messages: List[dict]) -> List[dict]:
+        """Replace large tool outputs of serialized messages with references to content-addressed blobs."""
+        if self.blob_threshold is None:
+            return messages
+        for message in messages:
+            content = message["data"].get("content")
+            if message.get("type") != "tool" or not isinstance(content, str) or len(content) <= self.blob_threshold:
+                continue
+            data = content.encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()
+            blob_path = self._get_blob_path(digest)
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+                with gzip.open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, blob_path)
+            message["data"]["content"] = {"blob": digest}
+        return messages
+
+    def _load_blobs(self, messages: List[dict]) -> List[dict]:
+        """Inline the blobs referenced by serialized messages."""
+        for message in messages:
+            content = message["data"].get("content")
+            if not isinstance(content, dict) or "blob" not in content:
+                continue
+            try:
+                with gzip.open(self._get_blob_path(content["blob"]), "rb") as f:
+                    message["data"]["content"] = f.read().decode("utf-8")
+            except OSError as e:
+                print(f"[Warning] Failed to read stored tool output {content['blob']}: {e}")
+                message["data"]["content"] = "[Tool output unavailable]"
+        return messages
+
+    def _schedule_summary(self, user_id: str, thread_id: str, turns: List[List]):
+        """Generate the summary of a thread in the background, unless one is already being generated."""
+        with self._lock:
+            if (user_id, thread_id) in self._pending_summaries:
+                return
+            self._pending_summaries.add((user_id, thread_id))
+        try:
+            self._summary_executor.submit(self._summarize_thread, user_id, thread_id, turns)
+        except RuntimeError:
+            # The executor is shut down
+            with self._lock:
+                self._pending_summaries.discard((user_id, thread_id))
+
+    def _summarize_thread(self, user_id: str, thread_id: str, turns: List[List]):
+        try:
+            summary = self._get_cached_summary(turns)
+            with self._lock:
+                file_path = self._get_file_path(user_id, thread_id)
+                if not os.path.exists(file_path):
+                    return  # Deleted in the meantime
+                entry = self._get_entry(user_id, thread_id, file_path)
+                if entry["summary"]:
+                    return
+                with self._open(file_path, "a") as f:
+                    f.write(json.dumps({"type": "meta", "summary": summary}) + "\n")
+                entry["summary"] = summary
+                entry["bytes"] = os.path.getsize(file_path)
+                self._write_index(user_id, self._load_index(user_id))
+                self._index_summary(user_id, thread_id, summary)
+        except Exception as e:
+            print(f"[Warning] Failed to save the summary of conversation {thread_id}: {e}")
+        finally:
+            with self._lock:
+                self._pending_summaries.discard((user_id, thread_id))
+
+    def _get_cached_summary(self, turns: List[List]) -> str:
+        """Return the summary of the given turns, reusing the one generated for identical turns."""
+        contents = [[msg.type, msg.content] for turn in turns for msg in turn]
+        key = hashlib.sha256(json.dumps(contents, default=str).encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._summary_cache:
+                self._summary_cache.move_to_end(key)
+                return self._summary_cache[key]
+        summary = self._generate_summary(turns)
+        with self._lock:
+            self._summary_cache[key] = summary
+            if len(self._summary_cache) > self.SUMMARY_CACHE_SIZE:
+                self._summary_cache.popitem(last=False)
+        return summary
+
+    def wait_for_summaries(self):
+        """Block until the summaries scheduled so far are saved."""
+        self._summary_executor.submit(lambda: None).result()
+
+    def close(self):
+        """Finish the pending summaries, stop the background worker and close the search index."""
+        self._summary_executor.shutdown(wait=True)
+        with self._lock:
+            self._search_db.close()
+
+    @staticmethod
+    def _message_text(message: dict) -> str:
+        """The searchable text of a serialized message; tool calls and outputs are not indexed."""
+        if message.get("type") not in ("human", "ai"):
+            return ""
+        content = message["data"].get("content")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+        return content if isinstance(content, str) else ""
+
+    def _index_turns(self, user_id: str, thread_id: str, first_turn: int, turns: List[List[dict]]):
+        """Add serialized turns to the search index, skipping the ones it already holds."""
+        with self._lock, self._search_db:
+            row = self._search_db.execute("SELECT turns FROM indexed_threads WHERE user_id = ? AND thread_id = ?",
+                                          (user_id, thread_id)).fetchone()
+            indexed = row[0] if row else 0
+            rows = []
+            for turn_number, turn in enumerate(turns, start=first_turn):
+                if turn_number < indexed:
+                    continue
+                rows.extend((text, user_id, thread_id, turn_number) for text in map(self._message_text, turn) if text)
+            self._search_db.executemany("INSERT INTO messages (content, user_id, thread_id, turn) VALUES (?, ?, ?, ?)",
+                                        rows)
+            self._search_db.execute("INSERT OR REPLACE INTO indexed_threads (user_id, thread_id, turns) VALUES (?, ?, ?)",
+                                    (user_id, thread_id, max(indexed, first_turn + len(turns))))
+
+    def _index_summary(self, user_id: str, thread_id: str, summary: str):
+        with self._lock, self._search_db:
+            self._search_db.execute("DELETE FROM messages WHERE user_id = ? AND thread_id = ? AND turn = -1",
+                                    (user_id, thread_id))
+            self._search_db.execute("INSERT INTO messages (content, user_id, thread_id, turn) VALUES (?, ?, ?, -1)",
+                                    (summary, user_id, thread_id))
+
+    def _unindex_thread(self, user_id: str, thread_id: str):
+        with self._lock, self._search_db:
+            self._search_db.execute("DELETE FROM messages WHERE user_id = ? AND thread_id = ?", (user_id, thread_id))
+            self._search_db.execute("DELETE FROM indexed_threads WHERE user_id = ? AND thread_id = ?",
+                                    (user_id, thread_id))
+
+    def _sync_search_index(self, user_id: str):
+        """Index the threads saved before the search index existed and drop the ones deleted outside of it."""
+        with self._lock:
+            threads = self._load_index(user_id)
+            indexed = dict(self._search_db.execute("SELECT thread_id, turns FROM indexed_threads WHERE user_id = ?",
+                                                   (user_id,)).fetchall())
+            for thread_id in indexed.keys() - threads.keys():
+                self._unindex_thread(user_id, thread_id)
+            for thread_id, entry in threads.items():
+                indexed_turns = indexed.get(thread_id)
+                if indexed_turns is not None and indexed_turns >= entry["turns"]:
+                    continue
+                try:
+                    file_path = self._get_file_path(user_id, thread_id)
+                    if os.path.exists(file_path):
+                        missing = self._read_turns(file_path, limit=entry["turns"] - (indexed_turns or 0))
+                    else:
+                        missing = self._read_legacy(self._get_legacy_file_path(user_id, thread_id))["messages"]
+                        missing = missing[indexed_turns or 0:]
+                except Exception as e:
+                    print(f"[Warning] Failed to index conversation {thread_id} for search: {e}")
+                    continue
+                self._index_turns(user_id, thread_id, entry["turns"] - len(missing), missing)
+                if indexed_turns is None and entry["summary"]:
+                    self._index_summary(user_id, thread_id, entry["summary"])
+            self._search_synced.add(user_id)
+
+    def search(self, user_id: str, query: str, limit: int = 20) -> List[dict]:
+        """
+        Full-text search over a user's conversations.
+
+        Args:
+            user_id (str): The ID of the user.
+            query (str): Words to look for; the last word also matches as a prefix.
+            limit (int): Maximum number of threads to return.
+
+        Returns:
+            List[dict]: The index entries of the best matching threads, best first, each with a "snippet"
+            of the matching message.
+        """
+        words = query.split()
+        if not words:
+            return []
+        # Quote every word so that FTS5 operators typed by the user are matched literally
+        match = " ".join('"' + word.replace('"', '""') + '"' for word in words) + "*"
+        with self._lock:
+            if user_id not in self._search_synced:
+                self._sync_search_index(user_id)
+            threads = self._load_index(user_id)
+            rows = self._search_db.execute(
+                "SELECT thread_id, snippet(messages, 0, '**', '**', '…', 12) FROM messages "
+                "WHERE messages MATCH ? AND user_id = ? ORDER BY rank LIMIT ?",
+                (match, user_id, limit * 10)).fetchall()
+        results = {}
+        for thread_id, snippet in rows:
+            if thread_id not in results and thread_id in threads:
+                results[thread_id] = {**threads[thread_id], "snippet": snippet}
+                if len(results) >= limit:
+                    break
+        return list(results.values())
 
     def _generate_summary(self, messages: List[List]) -> str:
         if not self.llm:
@@ -54,9 +543,9 @@ class ConversationHistoryManager:
                         return content.strip()[:80] + "..." if len(content) > 80 else content.strip()
             return "No summary available."
 
-        # Convert all turns to flat message list for summarization
+        # Convert the opening turns to flat message list for summarization
         flat_messages = []
-        for turn in messages:
+        for turn in messages[:self.SUMMARY_TURNS]:
             flat_messages.extend(turn)
 
         # Compose a prompt for summarizing the conversation
@@ -77,15 +566,65 @@ class ConversationHistoryManager:
             print(f"[Warning] Failed to generate summary using LLM: {e}")
             return "Summary unavailable"
 
-    def load(self, personal_assistant: PersonalAssistant, user_id: str, thread_id: str) -> ConversationManager:
+    def load(self, personal_assistant: PersonalAssistant, user_id: str, thread_id: str,
+             last_n: Optional[int] = None) -> ConversationManager:
+        """
+        Load a saved conversation, materializing only its most recent turns.
+
+        Args:
+            personal_assistant (PersonalAssistant): The assistant continuing the conversation.
+            user_id (str): The ID of the user.
+            thread_id (str): The ID of the conversation thread.
+            last_n (Optional[int]): Number of most recent turns to load; all turns when None.
+                The returned manager's turn_offset tells how many earlier turns remain on disk.
+
+        Returns:
+            ConversationManager: The conversation, or a new one if the thread does not exist.
+        """
         file_path = self._get_file_path(user_id, thread_id)
+        legacy_path = self._get_legacy_file_path(user_id, thread_id)
+        if os.path.exists(file_path):
+            total = self._get_entry(user_id, thread_id, file_path)["turns"]
+            serialized = self._read_turns(file_path, limit=last_n)
+        elif os.path.exists(legacy_path):
+            all_turns = self._read_legacy(legacy_path)["messages"]
+            total = len(all_turns)
+            serialized = all_turns if last_n is None else all_turns[max(total - last_n, 0):]
+        else:
+            return ConversationManager(personal_assistant)
+        messages = [messages_from_dict(self._load_blobs(turn)) for turn in serialized]
+        return ConversationManager(personal_assistant, thread_id=thread_id, messages=messages,
+                                   turn_offset=total - len(messages))
+
+    def load_earlier(self, conversation: ConversationManager, limit: int = 20) -> int:
+        """
+        Page back through a partially loaded conversation by prepending earlier turns.
+
+        Args:
+            conversation (ConversationManager): A conversation returned by load.
+            limit (int): Maximum number of earlier turns to load.
+
+        Returns:
+            int: Number of turns loaded.
+        """
+        if conversation.turn_offset <= 0:
+            return 0
+        user_id = conversation.personal_assistant.user
+        file_path = self._get_file_path(user_id, conversation.thread_id)
+        legacy_path = self._get_legacy_file_path(user_id, conversation.thread_id)
+        count = min(limit, conversation.turn_offset)
+        start = conversation.turn_offset - count
         if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                raw = json.load(f)
-                serialized = raw["messages"] if isinstance(raw, dict) and "messages" in raw else raw
-                messages = [messages_from_dict(turn) for turn in serialized]
-                return ConversationManager(personal_assistant, thread_id=thread_id, messages=messages)
-        return ConversationManager(personal_assistant)
+            total = self._get_entry(user_id, conversation.thread_id, file_path)["turns"]
+            serialized = self._read_turns(file_path, skip_last=total - conversation.turn_offset, limit=count)
+        elif os.path.exists(legacy_path):
+            serialized = self._read_legacy(legacy_path)["messages"][start:conversation.turn_offset]
+        else:
+            return 0
+        turns = [messages_from_dict(self._load_blobs(turn)) for turn in serialized]
+        conversation.conversation_messages[:0] = turns
+        conversation.turn_offset -= len(turns)
+        return len(turns)
 
     def delete_conversation(self, user_id: str, thread_id: str) -> bool:
         """
@@ -98,31 +637,57 @@ class ConversationHistoryManager:
         Returns:
             bool: True if the file was successfully deleted, False otherwise.
         """
-        file_path = self._get_file_path(user_id, thread_id)
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                return True
-            except Exception as e:
-                print(f"[Error] Failed to delete conversation file: {e}")
-                return False
-        else:
-            print(f"[Warning] Conversation file does not exist: {file_path}")
+        file_paths = [path for path in (self._get_file_path(user_id, thread_id),
+                                        self._get_legacy_file_path(user_id, thread_id)) if os.path.exists(path)]
+        if not file_paths:
+            print(f"[Warning] Conversation file does not exist: {self._get_file_path(user_id, thread_id)}")
             return False
+        try:
+            with self._lock:
+                for file_path in file_paths:
+                    os.remove(file_path)
+                index = self._load_index(user_id)
+                if index.pop(thread_id, None) is not None:
+                    self._write_index(user_id, index)
+                self._unindex_thread(user_id, thread_id)
+            return True
+        except Exception as e:
+            print(f"[Error] Failed to delete conversation file: {e}")
+            return False
+
+    def list_thread_entries(self, user_id: str, sort_by: str = "updated_at", descending: bool = True,
+                            offset: int = 0, limit: Optional[int] = None) -> List[dict]:
+        """
+        List the index entries of a user's threads without opening any conversation file.
+
+        Args:
+            user_id (str): The ID of the user.
+            sort_by (str): Entry field to sort by, e.g. "updated_at", "created_at", "turns" or "bytes".
+            descending (bool): Sort from the largest to the smallest value.
+            offset (int): Number of entries to skip.
+            limit (Optional[int]): Maximum number of entries to return; all when None.
 
-    def list_threads(self, user_id: str) -> List[str]:
+        Returns:
+            List[dict]: Entries with thread_id, summary, created_at, updated_at, turns and bytes.
+        """
         user_dir = os.path.join(self.base_directory, user_id)
         if not os.path.exists(user_dir):
             return []
-        return [f[:-5] for f in os.listdir(user_dir) if f.endswith(".json")]
+        entries = sorted(self._load_index(user_id).values(), key=lambda e: (e.get(sort_by) is not None,
+                                                                             e.get(sort_by)), reverse=descending)
+        return entries[offset:] if limit is None else entries[offset:offset + limit]
+
+    def count_threads(self, user_id: str) -> int:
+        user_dir = os.path.join(self.base_directory, user_id)
+        return len(self._load_index(user_id)) if os.path.exists(user_dir) else 0
+
+    def list_threads(self, user_id: str, sort_by: str = "updated_at", descending: bool = True, offset: int = 0,
+                     limit: Optional[int] = None) -> List[str]:
+        return [entry["thread_id"] for entry in self.list_thread_entries(user_id, sort_by, descending, offset, limit)]
 
     def get_summary(self, user_id: str, thread_id: str) -> str:
-        file_path = self._get_file_path(user_id, thread_id)
-        if not os.path.exists(file_path):
+        user_dir = os.path.join(self.base_directory, user_id)
+        if not os.path.exists(user_dir):
             return thread_id
-        with open(file_path, 'r', encoding='utf-8') as f:
-            try:
-                data = json.load(f)
-                return data.get("summary", "thread_id")
-            except Exception:
-                return thread_id
+        entry = self._load_index(user_id).get(thread_id)
+        return (entry or {}).get("summary") or thread_id
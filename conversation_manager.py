@@ -1,13 +1,12 @@
-import tempfile
+import asyncio
 import uuid
 from typing import List
 
-from langchain_community.document_loaders import PyPDFLoader
-
+from document_ingestion import describe_document, document_kind
 from personal_assistant import PersonalAssistant
 from langsmith import traceable
-from utils import process_stream
-from langchain_core.messages import BaseMessage
+from utils import EchoLevel, process_message_stream, process_stream
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
 
 
 class ConversationManager:
@@ -16,19 +15,74 @@ class ConversationManager:
     """
 
     def __init__(self, personal_assistant: PersonalAssistant, thread_id: str = None,
-                 messages: List[List[BaseMessage]] = None):
+                 messages: List[List[BaseMessage]] = None, turn_offset: int = 0,
+                 echo_level: EchoLevel = EchoLevel.BRIEF):
         self.thread_id = thread_id or str(uuid.uuid4())
         self.personal_assistant = personal_assistant
         self.conversation_messages = messages or []
+        # Number of earlier saved turns that were not loaded into conversation_messages
+        self.turn_offset = turn_offset
+        # How much of each streamed message is printed to the console
+        self.echo_level = echo_level
+
+    async def ingest_document(self, source, name: str, mime_type: str = None) -> str:
+        """
+        Index an uploaded document for the assistant's user and return the message that stands in for it.
+
+        The document is streamed into the assistant's DocumentIngestor, so only a summary and its
+        document id enter the conversation; the model reads the content with the search_documents tool.
+
+        Args:
+            source: A file path or a binary file object.
+            name (str): The file name of the document.
+            mime_type (str): Its MIME type, if known.
+
+        Returns:
+            str: The summary message for the conversation.
+        """
+        user_id = self.personal_assistant.config["configurable"]["user_id"]
+        document = await asyncio.to_thread(self.personal_assistant.documents.ingest, user_id, source, name, mime_type)
+        return describe_document(document)
+
+    async def close_interrupted_turn(self, reason: str = "Cancelled by the user.") -> int:
+        """
+        Answer the tool calls left without a result by a turn that was cancelled mid-run.
+
+        A turn cancelled during a tool call leaves an AI message whose tool calls have no ToolMessage in the
+        thread's checkpoint, and providers reject every later request on such a thread. A ToolMessage with
+        ``reason`` is added for each of them, so the thread can be continued.
+
+        Args:
+            reason (str): The content of the added ToolMessages.
+
+        Returns:
+            int: The number of tool calls that were answered.
+        """
+        agent = self.personal_assistant.agent
+        config = self.personal_assistant.thread_config(self.thread_id)
+        state = await agent.aget_state(config)
+        messages = state.values.get("messages", []) if state.values else []
+        answered = set()
+        for message in reversed(messages):
+            if isinstance(message, ToolMessage):
+                answered.add(message.tool_call_id)
+            elif isinstance(message, AIMessage) and message.tool_calls:
+                missing = [call["id"] for call in message.tool_calls if call["id"] not in answered]
+                if missing:
+                    await agent.aupdate_state(config, {"messages": [
+                        ToolMessage(content=reason, tool_call_id=call_id) for call_id in missing]}, as_node="tools")
+                return len(missing)
+        return 0
 
     @traceable
-    async def process_input(self, user_input, uploaded_files=None, add_message_hook=None):
+    async def process_input(self, user_input, uploaded_files=None, add_message_hook=None, event_hook=None):
         """
         Handles user input and optional uploaded files, then streams assistant response.
-        """
-        # ... [existing uploaded files handling logic remains the same]
-        # Process uploaded files and append them as messages
 
+        When an event_hook is given, the response is streamed token by token: the hook receives the
+        token, tool_call and tool_result events described in utils.process_message_stream.
+        Uploaded text and PDF files are indexed rather than inlined: see ingest_document.
+        """
         if user_input.lower() in ["exit", "quit"]:
             print("Goodbye!")
             return None
@@ -37,35 +91,27 @@ class ConversationManager:
 
         if uploaded_files:
             for file in uploaded_files:
+                if document_kind(file.name, file.type) is None:
+                    messages.append(("user", f"[{file.name}] uploaded, but preview not supported."))
+                    continue
                 try:
-                    if file.type.startswith("text/") or file.type.endswith(".txt"):
-                        file_content = file.read().decode("utf-8")
-                        messages.append(("user", f"Uploaded file `{file.name}`:\n\n{file_content}"))
-                    elif file.type == "application/pdf":
-                        # Save the uploaded PDF to a temporary file
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                            tmp_file.write(file.read())
-                            tmp_file_path = tmp_file.name
-
-                        # Load the PDF content using PyPDFLoader
-                        loader = PyPDFLoader(tmp_file_path)
-                        pages = loader.load()
-
-                        # Concatenate page content into one string
-                        pdf_content = "\n\n".join(page.page_content for page in pages)
-
-                        messages.append(("user", f"Uploaded PDF `{file.name}`:\n\n{pdf_content.strip()}"))
-
-                    else:
-                        messages.append(("user", f"[{file.name}] uploaded, but preview not supported."))
+                    messages.append(("user", await self.ingest_document(file, file.name, file.type)))
                 except Exception as e:
                     messages.append(("user", f"Failed to read `{file.name}`: {str(e)}"))
 
         inputs = {"messages": messages}
-        message = await process_stream(
-            self.personal_assistant.agent.astream(inputs, stream_mode="values", config=self.personal_assistant.config),
-            add_message_hook
-        )
+        config = self.personal_assistant.thread_config(self.thread_id)
+        # "updates" mode yields only the messages each step adds, not the whole thread every step
+        if event_hook:
+            message = await process_message_stream(
+                self.personal_assistant.agent.astream(inputs, stream_mode=["messages", "updates"], config=config),
+                add_message_hook, event_hook, echo_level=self.echo_level, input_messages=messages
+            )
+        else:
+            message = await process_stream(
+                self.personal_assistant.agent.astream(inputs, stream_mode="updates", config=config),
+                add_message_hook, echo_level=self.echo_level, input_messages=messages
+            )
 
         self.conversation_messages.append(message)
         return message
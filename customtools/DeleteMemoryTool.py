@@ -3,22 +3,32 @@ from typing import Type, Optional
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 from langchain_core.runnables import RunnableConfig
-from langgraph.store.base import BaseStore, SearchItem
+from langgraph.store.base import BaseStore
+
+from prompt_cache import memory_prompt_cache
 
 
 class DeleteMemorySchema(BaseModel):
     """Input schema for DeleteMemoryTool."""
-    memory_key: str = Field(..., description="The key of the memory to be deleted.")
+    memory: str = Field(..., description="A description of the memory to be deleted.")
+
 
+# Minimum similarity for a memory to count as matching a description; the local hashing embedder
+# scores texts without words in common at about 0, and a shared content word at 0.25 or more
+MIN_MATCH_SCORE = 0.2
 
-def find_most_relevant_memory(store: BaseStore, namespace: tuple[str, ...], query: str) -> Optional[SearchItem]:
-    """Find the most relevant memory matching the query string."""
+
+def find_most_relevant_memory(store: BaseStore, namespace: tuple[str, ...], query: str,
+                              min_score: float = MIN_MATCH_SCORE) -> Optional[dict]:
+    """Find the most relevant memory matching the query string, or None if no memory scores ``min_score``."""
     results = store.search(
         namespace,
         query=query,
         limit=1  # Just get the top match
     )
-    return results[0] if results else None
+    if not results or (results[0].get("score") or 0.0) < min_score:
+        return None
+    return results[0]
 
 
 class DeleteMemoryTool(BaseTool):
@@ -26,13 +36,14 @@ class DeleteMemoryTool(BaseTool):
 
     name: str = "delete_memory"
     description: str = (
-        "Deletes a specific memory from the user's memory store using the provided key. "
+        "Deletes the memory from the user's memory store that best matches the provided description. "
         "This is useful for forgetting outdated or incorrect information."
     )
     args_schema: Type[DeleteMemorySchema] = DeleteMemorySchema
 
     store: BaseStore
     config: RunnableConfig
+    min_score: float = MIN_MATCH_SCORE
 
     def _run(self, memory: str) -> dict:
         """
@@ -52,16 +63,17 @@ class DeleteMemoryTool(BaseTool):
 
             namespace = ("memories", user_id)
 
-            most_relevant = find_most_relevant_memory(self.store, namespace, memory)
+            most_relevant = find_most_relevant_memory(self.store, namespace, memory, self.min_score)
 
             if not most_relevant:
                 return {"status": "not_found", "message": f"No matching memory for: '{memory}'"}
 
-            self.store.delete(namespace, most_relevant.key)
+            self.store.delete(namespace, most_relevant["key"])
+            memory_prompt_cache.bump(user_id)
 
             return {
                 "status": "success",
-                "message": f"Memory '{most_relevant.key}' deleted successfully."
+                "message": f"Memory '{most_relevant['value']['data']}' deleted successfully."
             }
 
         except Exception as error:
@@ -70,18 +82,18 @@ class DeleteMemoryTool(BaseTool):
                 "message": f"An error occurred while deleting memory: {error}",
             }
 
-    async def _arun(self, memory_key: str) -> dict:
+    async def _arun(self, memory: str) -> dict:
         """
         Delete the specified memory string asynchronously.
 
         Args:
-            memory_key (str): The key of the memory to be deleted.
+            memory (str): The str of the memory to be deleted.
 
         Returns:
             dict: Result of the delete operation.
         """
         try:
-            return await asyncio.to_thread(self._run, memory_key)
+            return await asyncio.to_thread(self._run, memory)
         except Exception as error:
             return {
                 "status": "error",
@@ -2,7 +2,6 @@ import asyncio
 from typing import Type
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
-from langchain_community.document_loaders import PyPDFLoader
 
 
 class PDFLoaderSchema(BaseModel):
@@ -29,6 +28,7 @@ class PDFLoaderTool(BaseTool):
         """
         try:
             # Load the PDF file
+            from langchain_community.document_loaders import PyPDFLoader
             loader = PyPDFLoader(file_path)
             docs = loader.load()
 
@@ -63,6 +63,7 @@ class PDFLoaderTool(BaseTool):
         """
         try:
             # Use asyncio to run the blocking PDF loading in a separate thread
+            from langchain_community.document_loaders import PyPDFLoader
             loader = PyPDFLoader(file_path)
             docs = await asyncio.to_thread(loader.load)
 
@@ -1,8 +1,7 @@
 import asyncio
-from typing import Type
+from typing import Any, Type
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field, PrivateAttr
-from langchain_experimental.utilities import PythonREPL
 
 
 class PythonInterpreterSchema(BaseModel):
@@ -20,12 +19,16 @@ class PythonInterpreterTool(BaseTool):
     )
     args_schema: Type[PythonInterpreterSchema] = PythonInterpreterSchema
 
-    # Define a private attribute for the Python REPL
-    _python_repl: PythonREPL = PrivateAttr()
+    # Define a private attribute for the Python REPL, created on first use
+    _python_repl: Any = PrivateAttr(default=None)
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self._python_repl = PythonREPL()
+    @property
+    def python_repl(self):
+        if self._python_repl is None:
+            # langchain_experimental is slow to import, so it is only loaded when code is run
+            from langchain_experimental.utilities import PythonREPL
+            self._python_repl = PythonREPL()
+        return self._python_repl
 
     def _run(self, code: str) -> dict:
         """
@@ -39,7 +42,7 @@ class PythonInterpreterTool(BaseTool):
         """
         try:
             # Execute the Python code
-            result = self._python_repl.run(code)
+            result = self.python_repl.run(code)
             return {
                 "status": "success",
                 "message": "Code executed successfully.",
@@ -63,7 +66,7 @@ class PythonInterpreterTool(BaseTool):
         """
         try:
             # Use asyncio to run the blocking code execution in a separate thread
-            result = await asyncio.to_thread(self._python_repl.run, code)
+            result = await asyncio.to_thread(self.python_repl.run, code)
             return {
                 "status": "success",
                 "message": "Code executed successfully.",
@@ -1,9 +1,41 @@
 import asyncio
-from typing import Type, Optional
+import os
+import time
+from typing import Type, Optional, List
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 from langchain_core.runnables import RunnableConfig
-from langgraph.store.base import BaseStore
+from langgraph.store.base import BaseStore, PutOp
+
+from prompt_cache import memory_prompt_cache
+
+
+def new_memory_key() -> str:
+    """Allocate a unique memory key in O(1).
+
+    Keys are ULID-style: a millisecond timestamp followed by random bits, so they never collide
+    and sort in the order the memories were saved.
+    """
+    return f"memory_{int(time.time() * 1000):012x}{os.urandom(10).hex()}"
+
+
+def save_memories(store: BaseStore, user_id: str, memories: List[str]) -> List[str]:
+    """
+    Save several memories for a user in a single store batch.
+
+    Args:
+        store (BaseStore): The store to write to.
+        user_id (str): The user owning the memories.
+        memories (List[str]): The memory strings to save.
+
+    Returns:
+        List[str]: The keys allocated for the memories, in order.
+    """
+    namespace = ("memories", user_id)
+    keys = [new_memory_key() for _ in memories]
+    store.batch([PutOp(namespace=namespace, key=key, value={"data": memory}) for key, memory in zip(keys, memories)])
+    memory_prompt_cache.bump(user_id)
+    return keys
 
 
 class SaveMemorySchema(BaseModel):
@@ -40,10 +72,7 @@ class SaveMemoryTool(BaseTool):
             if not user_id:
                 raise ValueError("User ID is missing in the configuration.")
 
-            # Namespace and key for saving the memory
-            namespace = ("memories", user_id)
-            memory_key = f"memory_{len(self.store.search(namespace))}"
-            self.store.put(namespace, memory_key, {"data": memory})
+            save_memories(self.store, user_id, [memory])
 
             return {
                 "status": "success",
@@ -73,3 +102,67 @@ class SaveMemoryTool(BaseTool):
                 "status": "error",
                 "message": f"An error occurred while saving memory asynchronously: {error}",
             }
+
+
+class SaveMemoriesSchema(BaseModel):
+    """Input schema for SaveMemoriesTool."""
+    memories: List[str] = Field(..., description="The memory strings to be saved for the user.")
+
+
+class SaveMemoriesTool(BaseTool):
+    """Tool to save several user-provided memories into a persistent store at once."""
+
+    name: str = "save_memories"
+    description: str = (
+        "Saves several memory strings to the user's memory store in one operation. "
+        "Prefer it over repeated save_memory calls when the user shares multiple facts."
+    )
+    args_schema: Type[SaveMemoriesSchema] = SaveMemoriesSchema
+
+    store: BaseStore
+    config: RunnableConfig
+
+    def _run(self, memories: List[str]) -> dict:
+        """
+        Save the given memory strings synchronously.
+
+        Args:
+            memories (List[str]): The memories to be saved.
+
+        Returns:
+            dict: Result of the save operation.
+        """
+        try:
+            user_id = self.config.get("configurable", {}).get("user_id")
+            if not user_id:
+                raise ValueError("User ID is missing in the configuration.")
+
+            save_memories(self.store, user_id, memories)
+
+            return {
+                "status": "success",
+                "message": f"{len(memories)} memories saved successfully."
+            }
+        except Exception as error:
+            return {
+                "status": "error",
+                "message": f"An error occurred while saving memories: {error}",
+            }
+
+    async def _arun(self, memories: List[str]) -> dict:
+        """
+        Save the given memory strings asynchronously.
+
+        Args:
+            memories (List[str]): The memories to be saved.
+
+        Returns:
+            dict: Result of the save operation.
+        """
+        try:
+            return await asyncio.to_thread(self._run, memories)
+        except Exception as error:
+            return {
+                "status": "error",
+                "message": f"An error occurred while saving memories asynchronously: {error}",
+            }
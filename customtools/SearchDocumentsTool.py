@@ -0,0 +1,78 @@
+import asyncio
+from typing import Type, Optional
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+from langchain_core.runnables import RunnableConfig
+
+from document_ingestion import DocumentIngestor
+
+
+class SearchDocumentsSchema(BaseModel):
+    """Input schema for SearchDocumentsTool."""
+    query: str = Field(..., description="What to look for in the uploaded documents.")
+    document_id: Optional[str] = Field(None, description="The id of one document to search, e.g. doc-1a2b3c4d5e6f7a8b. "
+                                                         "Leave empty to search all uploaded documents.")
+    limit: int = Field(5, description="The maximum number of passages to return.")
+
+
+class SearchDocumentsTool(BaseTool):
+    """Tool to retrieve the passages of uploaded documents relevant to a query."""
+
+    name: str = "search_documents"
+    description: str = (
+        "Searches the documents uploaded by the user and returns the most relevant passages with their page numbers. "
+        "Uploaded documents only appear in the conversation as a short summary, so use this tool to read their content."
+    )
+    args_schema: Type[SearchDocumentsSchema] = SearchDocumentsSchema
+
+    ingestor: DocumentIngestor
+    config: RunnableConfig
+
+    def _run(self, query: str, document_id: Optional[str] = None, limit: int = 5) -> dict:
+        """
+        Search the user's documents synchronously.
+
+        Args:
+            query (str): What to look for.
+            document_id (Optional[str]): Restrict the search to this document.
+            limit (int): The maximum number of passages to return.
+
+        Returns:
+            dict: Result of the search, with the passages found under "results".
+        """
+        try:
+            user_id = self.config.get("configurable", {}).get("user_id")
+            if not user_id:
+                raise ValueError("User ID is missing in the configuration.")
+
+            results = self.ingestor.search(user_id, query, document_id=document_id, limit=limit)
+            return {
+                "status": "success",
+                "message": f"Found {len(results)} passages.",
+                "results": results,
+            }
+        except Exception as error:
+            return {
+                "status": "error",
+                "message": f"An error occurred while searching documents: {error}",
+            }
+
+    async def _arun(self, query: str, document_id: Optional[str] = None, limit: int = 5) -> dict:
+        """
+        Search the user's documents asynchronously.
+
+        Args:
+            query (str): What to look for.
+            document_id (Optional[str]): Restrict the search to this document.
+            limit (int): The maximum number of passages to return.
+
+        Returns:
+            dict: Result of the search, with the passages found under "results".
+        """
+        try:
+            return await asyncio.to_thread(self._run, query, document_id, limit)
+        except Exception as error:
+            return {
+                "status": "error",
+                "message": f"An error occurred while searching documents asynchronously: {error}",
+            }
@@ -0,0 +1,233 @@
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+from langgraph.store.base import GetOp, PutOp
+
+from SQLiteStore import SQLiteStore
+
+# Chunks are embedded locally from their "text" field, like memories
+DOCUMENT_INDEX = {"fields": ["text"]}
+READ_BLOCK_SIZE = 64 * 1024
+TEXT_EXTENSIONS = (".txt", ".md", ".csv", ".json", ".log")
+
+
+def document_kind(name: str, mime_type: Optional[str] = None) -> Optional[str]:
+    """Return "pdf" or "text" for the documents that can be ingested, else None."""
+    name = name.lower()
+    mime_type = mime_type or ""
+    if mime_type == "application/pdf" or name.endswith(".pdf"):
+        return "pdf"
+    if mime_type.startswith("text/") or name.endswith(TEXT_EXTENSIONS):
+        return "text"
+    return None
+
+
+def chunk_text(blocks: Iterable[str], chunk_size: int = 1500, overlap: int = 200) -> Iterator[str]:
+    """
+    Split a stream of text blocks into chunks of at most ``chunk_size`` characters.
+
+    Chunks end at whitespace where possible, and each chunk starts with the last ``overlap`` characters
+    (at most a quarter of ``chunk_size``) of the previous one, so a passage cut at a boundary is still
+    found whole. Only the current block and the unfinished chunk are held in memory.
+
+    Args:
+        blocks (Iterable[str]): The text, in consecutive pieces of any size.
+        chunk_size (int): Maximum length of a chunk.
+        overlap (int): Number of characters repeated between consecutive chunks.
+
+    Returns:
+        Iterator[str]: The non-empty chunks, in order.
+    """
+    overlap = min(overlap, chunk_size // 4)
+    buffer = ""
+    for block in blocks:
+        buffer += block
+        start = 0
+        while len(buffer) - start > chunk_size:
+            end = start + chunk_size
+            half = start + chunk_size // 2
+            cut = max(buffer.rfind(" ", half, end), buffer.rfind("\n", half, end))
+            if cut == -1:
+                cut = end
+            chunk = buffer[start:cut].strip()
+            if chunk:
+                yield chunk
+            # Start the overlap at a word boundary
+            next_start = cut - overlap
+            space = buffer.find(" ", next_start, cut)
+            start = space + 1 if space != -1 else next_start
+        buffer = buffer[start:]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def _read_text_blocks(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            block = f.read(READ_BLOCK_SIZE)
+            if not block:
+                return
+            yield block
+
+
+def _read_pdf_pages(path: str) -> Iterator[tuple[int, str]]:
+    """Yield the 1-based number and text of each page, parsing one page at a time."""
+    from langchain_community.document_loaders import PyPDFLoader
+    for number, page in enumerate(PyPDFLoader(path).lazy_load(), start=1):
+        yield number, page.page_content
+
+
+class DocumentIngestor:
+    """
+    Streams uploaded documents into a local retrieval index, so conversations carry only a summary of them.
+
+    PDFs are parsed page by page and text files read block by block; the text is split into overlapping
+    chunks that are written to a SQLiteStore in batches, so memory use does not grow with the document.
+    Chunks are stored under ``("documents", user id, document id)``, embedded batch by batch with the local
+    hashing embedder and ranked by similarity (see search). A document's id is the hash of its content, so
+    uploading the same file again reuses the chunks indexed the first time.
+    """
+
+    BATCH_SIZE = 64
+    EXCERPT_CHARS = 600
+
+    def __init__(self, db_path: str = "documents.db", chunk_size: int = 1500, chunk_overlap: int = 200,
+                 max_bytes: int = 50 * 1024 * 1024, max_chunks: int = 10000):
+        self.store = SQLiteStore(db_path=db_path, index=DOCUMENT_INDEX)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_bytes = max_bytes
+        self.max_chunks = max_chunks
+
+    def close(self):
+        self.store.close()
+
+    def ingest(self, user_id: str, source: Union[str, BinaryIO], name: str, mime_type: Optional[str] = None) -> dict:
+        """
+        Index a document for a user, or return the existing entry if it was indexed before.
+
+        Args:
+            user_id (str): The user owning the document.
+            source (Union[str, BinaryIO]): A file path, or a binary file object (e.g. a Streamlit upload)
+                that is copied to a temporary file in blocks.
+            name (str): The file name of the document.
+            mime_type (Optional[str]): Its MIME type; when None the type is told from the name.
+
+        Returns:
+            dict: The document entry: document_id, name, kind, pages, chunks, excerpt and truncated.
+
+        Raises:
+            ValueError: If the document type is not supported or the file exceeds ``max_bytes``.
+        """
+        kind = document_kind(name, mime_type)
+        if kind is None:
+            raise ValueError(f"Unsupported document type: {mime_type or name}")
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                document_id = self._hash(f)
+            return self._ingest_file(user_id, str(source), document_id, name, kind)
+
+        with tempfile.NamedTemporaryFile(suffix=os.path.splitext(name)[1], delete=False) as tmp_file:
+            try:
+                document_id = self._hash(source, tmp_file)
+            except ValueError:
+                tmp_file.close()
+                os.remove(tmp_file.name)
+                raise
+        try:
+            return self._ingest_file(user_id, tmp_file.name, document_id, name, kind)
+        finally:
+            os.remove(tmp_file.name)
+
+    def _hash(self, source: BinaryIO, copy_to: Optional[BinaryIO] = None) -> str:
+        """Hash a file in blocks, optionally copying it, and enforce ``max_bytes``."""
+        digest, size = hashlib.sha256(), 0
+        while True:
+            block = source.read(READ_BLOCK_SIZE)
+            if not block:
+                return f"doc-{digest.hexdigest()[:16]}"
+            size += len(block)
+            if size > self.max_bytes:
+                raise ValueError(f"The file is larger than the {self.max_bytes / (1024 * 1024):g} MB limit.")
+            digest.update(block)
+            if copy_to is not None:
+                copy_to.write(block)
+
+    def _chunks(self, path: str, kind: str, document: dict) -> Iterator[tuple[Optional[int], str]]:
+        """Yield the (page, text) chunks of a file; PDF page counts are recorded in ``document``."""
+        if kind == "pdf":
+            for number, text in _read_pdf_pages(path):
+                document["pages"] = number
+                for chunk in chunk_text([text], self.chunk_size, self.chunk_overlap):
+                    yield number, chunk
+        else:
+            for chunk in chunk_text(_read_text_blocks(path), self.chunk_size, self.chunk_overlap):
+                yield None, chunk
+
+    def _write_chunks(self, ops: list, namespace: tuple[str, ...]):
+        # Chunks are embedded as they are written, so the first search does not embed the whole document
+        self.store.batch(ops)
+        self.store.embed_pending(namespace)
+
+    def _ingest_file(self, user_id: str, path: str, document_id: str, name: str, kind: str) -> dict:
+        meta_namespace = ("document_meta", user_id)
+        existing = self.store.batch([GetOp(meta_namespace, document_id)])[0]
+        if existing is not None:
+            return existing
+
+        namespace = ("documents", user_id, document_id)
+        document = {"document_id": document_id, "name": name, "kind": kind, "pages": None, "chunks": 0,
+                    "excerpt": "", "truncated": False}
+        ops = []
+        try:
+            for page, text in self._chunks(path, kind, document):
+                if document["chunks"] >= self.max_chunks:
+                    document["truncated"] = True
+                    break
+                if not document["excerpt"]:
+                    document["excerpt"] = text[:self.EXCERPT_CHARS]
+                ops.append(PutOp(namespace, f"chunk_{document['chunks']:06d}", {
+                    "document_id": document_id, "name": name, "page": page, "text": text}))
+                document["chunks"] += 1
+                if len(ops) >= self.BATCH_SIZE:
+                    self._write_chunks(ops, namespace)
+                    ops = []
+            self._write_chunks(ops, namespace)
+            self.store.batch([PutOp(meta_namespace, document_id, document)])
+        except Exception:
+            # Drop the chunks written so far, so a failed document does not show up in searches
+            self.store.batch([PutOp(namespace, f"chunk_{i:06d}", None) for i in range(document["chunks"])])
+            raise
+        return document
+
+    def search(self, user_id: str, query: str, document_id: Optional[str] = None, limit: int = 5) -> list[dict]:
+        """
+        Find the chunks of a user's documents most similar to the query.
+
+        Args:
+            user_id (str): The user whose documents are searched.
+            query (str): What to look for.
+            document_id (Optional[str]): Restrict the search to one document.
+            limit (int): Maximum number of chunks to return.
+
+        Returns:
+            list[dict]: The best chunks, each with document_id, name, page, text and score.
+        """
+        namespace = ("documents", user_id) + ((document_id,) if document_id else ())
+        results = self.store.search(namespace, query=query, limit=limit)
+        return [{**result["value"], "score": round(result.get("score", 0.0), 3)} for result in results]
+
+
+def describe_document(document: dict) -> str:
+    """The message that stands in for an ingested document in the conversation."""
+    size = f"{document['chunks']} chunks"
+    if document["pages"]:
+        size = f"{document['pages']} pages, {size}"
+    if document["truncated"]:
+        size += ", truncated"
+    return (f"Uploaded {document['kind'].upper() if document['kind'] == 'pdf' else 'file'} `{document['name']}` "
+            f"was indexed as document `{document['document_id']}` ({size}). Its full text is not included here: "
+            f"call search_documents with document_id=\"{document['document_id']}\" to retrieve the passages "
+            f"relevant to the request.\n\nOpening excerpt:\n{document['excerpt']}")
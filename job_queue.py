@@ -0,0 +1,134 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Hashable, Optional
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue, or the user's share of it, is full."""
+
+
+class Job:
+    """A submitted unit of work; ``position`` is its place in line when it was queued, or 0 if it started at once."""
+
+    def __init__(self, user_id: Hashable, factory: Callable[[], Awaitable], position: int):
+        self.user_id = user_id
+        self.factory = factory
+        self.position = position
+        self.task: Optional[asyncio.Task] = None
+        self.result = asyncio.get_running_loop().create_future()
+        # Failures are reported by the queue, so an unawaited result must not warn about them again
+        self.result.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+
+class FairJobQueue:
+    """
+    A bounded async job queue that runs at most ``concurrency`` jobs at once and shares them fairly.
+
+    Each user has at most one running job, so a user's jobs run in submission order, and users with
+    pending jobs take turns (round robin), so one user's burst of requests cannot starve the others.
+    At most ``max_pending`` jobs wait in total and ``max_pending_per_user`` per user; beyond that
+    ``submit`` raises QueueFull so callers can push back.
+    """
+
+    def __init__(self, concurrency: int = 4, max_pending: int = 100, max_pending_per_user: int = 5):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.max_pending_per_user = max_pending_per_user
+        self._pending = {}  # user id -> deque of jobs, oldest first
+        self._turns = deque()  # users with pending jobs, in turn order
+        self._running = {}  # user id -> running job
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(jobs) for jobs in self._pending.values())
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    def submit(self, user_id: Hashable, factory: Callable[[], Awaitable]) -> Job:
+        """
+        Queue a job for a user and start it right away if a slot is free.
+
+        Args:
+            user_id (Hashable): The user the job belongs to.
+            factory (Callable[[], Awaitable]): Creates the coroutine to run; it is only called when the job starts.
+
+        Returns:
+            Job: The job; its ``position`` is 0 when it started immediately, else its 1-based place in line.
+        """
+        user_jobs = self._pending.get(user_id, ())
+        if self.pending_count >= self.max_pending or len(user_jobs) >= self.max_pending_per_user:
+            raise QueueFull(f"Too many pending jobs for {user_id}.")
+        # The user's running job is not in line. Under round robin, every other user runs at most one job
+        # more than this user has pending ahead of the new one
+        own_ahead = len(user_jobs)
+        ahead = own_ahead + sum(min(len(jobs), own_ahead + 1) for other, jobs in self._pending.items()
+                                if other != user_id)
+        job = Job(user_id, factory, ahead + 1)
+        if user_id not in self._pending:
+            self._pending[user_id] = deque()
+            self._turns.append(user_id)
+        self._pending[user_id].append(job)
+        self._dispatch()
+        if job.task is not None:
+            job.position = 0
+        return job
+
+    def cancel(self, user_id: Hashable) -> int:
+        """Drop a user's pending jobs and cancel the running one; return the number of jobs cancelled."""
+        cancelled = 0
+        for job in self._pending.pop(user_id, ()):
+            job.result.cancel()
+            cancelled += 1
+        if user_id in self._turns:
+            self._turns.remove(user_id)
+        running = self._running.get(user_id)
+        if running is not None and running.task is not None and not running.task.done():
+            running.task.cancel()
+            cancelled += 1
+        return cancelled
+
+    def _next_job(self) -> Optional[Job]:
+        """Take the oldest job of the first user in turn order who has no job running."""
+        for _ in range(len(self._turns)):
+            user_id = self._turns.popleft()
+            if user_id in self._running:
+                self._turns.append(user_id)
+                continue
+            jobs = self._pending[user_id]
+            job = jobs.popleft()
+            if jobs:
+                self._turns.append(user_id)
+            else:
+                del self._pending[user_id]
+            return job
+        return None
+
+    def _dispatch(self):
+        while len(self._running) < self.concurrency:
+            job = self._next_job()
+            if job is None:
+                return
+            self._running[job.user_id] = job
+            job.task = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: Job):
+        try:
+            result = await job.factory()
+            if not job.result.done():
+                job.result.set_result(result)
+        except asyncio.CancelledError:
+            job.result.cancel()
+        except Exception as e:
+            print(f"[Error] Job of {job.user_id} failed: {e}")
+            if not job.result.done():
+                job.result.set_exception(e)
+        finally:
+            self._running.pop(job.user_id, None)
+            self._dispatch()
+
+    async def join(self):
+        """Wait until every queued and running job is finished."""
+        while self._running or self._pending:
+            await asyncio.gather(*(job.task for job in list(self._running.values())), return_exceptions=True)
@@ -1,33 +1,48 @@
 import os
-import tempfile
-from langchain_community.agent_toolkits.load_tools import load_tools
-from langchain.memory import ConversationSummaryBufferMemory
-from langchain_community.agent_toolkits import GmailToolkit, FileManagementToolkit, SlackToolkit
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_community.tools import ShellTool
-from langchain_community.tools.gmail import get_gmail_credentials
-from langchain_community.tools.gmail.utils import build_resource_service
-from langchain_community.tools.semanticscholar import SemanticScholarQueryRun
-from langchain_core.language_models import BaseChatModel
+import threading
+import time
+import asyncio
+from typing import Optional
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import AzureChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 from langgraph.prebuilt.chat_agent_executor import AgentState
 from JsonFileStore import JSONFileStore
+from SQLiteStore import SQLiteStore, migrate_json_store
+from SQLiteCheckpointSaver import SQLiteCheckpointSaver
 from customtools.DeleteMemoryTool import DeleteMemoryTool
-from customtools.PDFLoader import PDFLoaderTool
 from customtools.PythonInterpreter import PythonInterpreterTool
-from customtools.SaveMemoryTool import SaveMemoryTool
-from ready_tools import datetime_tool, drive_tool, get_custom_gmail_tools
-from langchain_community.agent_toolkits.playwright.toolkit import PlayWrightBrowserToolkit
-from langchain_community.tools.playwright.utils import create_async_playwright_browser
+from customtools.SaveMemoryTool import SaveMemoryTool, SaveMemoriesTool
+from customtools.SearchDocumentsTool import SearchDocumentsTool
+from document_ingestion import DocumentIngestor
 from langgraph.store.base import BaseStore
+from prompt_cache import memory_prompt_cache
+from tool_registry import tool_registry, warm_up_tools
+from token_budget import TokenBudget, count_tokens, count_message_tokens, token_usage_log
+
+
+# Memories are embedded locally from their "data" field so retrieval never calls a remote model
+MEMORY_INDEX = {"fields": ["data"]}
+
+
+def _latest_user_text(messages: list) -> Optional[str]:
+    """Return the content of the most recent user message, if any."""
+    for message in reversed(messages):
+        role = message[0] if isinstance(message, tuple) else getattr(message, "type", None)
+        if role in ("user", "human"):
+            content = message[1] if isinstance(message, tuple) else message.content
+            return content if isinstance(content, str) else str(content)
+    return None
 
 
 def prepare_model_inputs(state: AgentState, config: RunnableConfig, store: BaseStore) -> list[dict]:
     """Prepare model inputs by retrieving user memories and adding them to the system message.
 
+    The input is kept within ``max_input_tokens`` (configurable, default 32000): the system prompt is
+    always sent, the ranked memories get up to ``memory_token_share`` of the rest and the most recent
+    messages fill what is left; the current turn is always sent whole, with its tool results truncated if
+    needed (see TokenBudget). Token counts of each call are recorded in ``token_usage_log``.
+    The rendered prompt is cached per user until the next user message or memory write.
+
     Args:
         state (AgentState): Current state of the agent.
         config (RunnableConfig): Configuration containing user-specific details.
@@ -45,30 +60,113 @@ def prepare_model_inputs(state: AgentState, config: RunnableConfig, store: BaseS
     if not system_prompt:
         raise ValueError("System prompt is missing in the configuration.")
 
-    # Retrieve memory entries from the store
-    namespace = ("memories", user_id)
-    memories = [m['value']["data"] for m in store.search(namespace)]
+    budget = TokenBudget(max_input_tokens=configurable.get("max_input_tokens", 32000),
+                         memory_share=configurable.get("memory_token_share", 0.15))
+    messages = state.get("messages", [])
+    query = _latest_user_text(messages)
+    memory_limit = configurable.get("memory_limit", 10)
 
-    # Combine base system prompt with user memories
-    if memories:
-        memory_text = "User memories: " + ", ".join(memories)
-        full_prompt = f"{system_prompt}\n\n{memory_text}"
-    else:
-        full_prompt = system_prompt
+    # Every step of a ReAct loop renders the same prompt until the user speaks again or a memory changes
+    cache_key = (system_prompt, query, memory_limit, budget.max_input_tokens, budget.memory_share)
+    version = memory_prompt_cache.version(user_id)
+    cached = memory_prompt_cache.get(user_id, cache_key)
+    if cached is None:
+        # Retrieve the memories most relevant to the current turn from the store
+        namespace = ("memories", user_id)
+        results = store.search(namespace, query=query, limit=memory_limit)
+        ranked = [(m['key'], m['value']["data"]) for m in results]
+        selected, system_tokens, memory_tokens = budget.select_memories(system_prompt, [m for _, m in ranked])
+        # Render the selected memories in key order, so the prompt prefix stays stable across turns
+        # and benefits from provider-side prompt caching
+        memories = [memory for _, memory in sorted(ranked[:len(selected)])]
 
-    return [{"role": "system", "content": full_prompt}] + state.get("messages", [])
+        # Combine base system prompt with user memories
+        if memories:
+            memory_text = "User memories: " + ", ".join(memories)
+            full_prompt = f"{system_prompt}\n\n{memory_text}"
+        else:
+            full_prompt = system_prompt
+        cached = (full_prompt, count_tokens(full_prompt), len(memories), system_tokens, memory_tokens)
+        memory_prompt_cache.put(user_id, cache_key, cached, version)
+    full_prompt, prompt_tokens, memory_count, system_tokens, memory_tokens = cached
+
+    trimmed_messages = budget.trim_messages(messages, prompt_tokens)
+    dropped = len(messages) - len(trimmed_messages)
+    if dropped:
+        full_prompt += f"\n\nNote: {dropped} earlier messages of this conversation were omitted to fit the context."
+
+    token_usage_log.record(user_id, configurable.get("thread_id"), {
+        "system_tokens": system_tokens,
+        "memory_tokens": memory_tokens,
+        "message_tokens": count_message_tokens(trimmed_messages),
+        "memories": memory_count,
+        "messages": len(trimmed_messages),
+        "dropped_messages": dropped,
+    })
+
+    return [{"role": "system", "content": full_prompt}] + trimmed_messages
+
+
+def create_store(store_path: str, legacy_json_path: str = "data_store.json") -> BaseStore:
+    """Create the memory store for the given path.
+
+    Paths ending in .db/.sqlite/.sqlite3 open a SQLiteStore; a new database is populated once from
+    the legacy JSON store if that file exists. Any other path opens a JSONFileStore in WAL mode
+    whose writes are group-committed, so bursts of memory saves reach the disk together.
+    Both backends index the memory text for semantic search with the local hashing embedder.
+    """
+    if store_path.endswith((".db", ".sqlite", ".sqlite3")):
+        if not os.path.exists(store_path) and os.path.exists(legacy_json_path):
+            migrated = migrate_json_store(legacy_json_path, store_path)
+            print(f"Migrated {migrated} items from {legacy_json_path} to {store_path}.")
+        return SQLiteStore(db_path=store_path, index=MEMORY_INDEX)
+    return JSONFileStore(file_path=store_path, wal=True, flush_every=20, flush_interval_ms=200, index=MEMORY_INDEX)
+
+
+# A JSONFileStore keeps its file in memory and rewrites it on compaction, so two stores on one file would
+# drop each other's writes: the assistants of a process (e.g. every Streamlit session) share one per path.
+_open_stores = {}  # absolute store path -> [store, number of assistants using it]
+_open_stores_lock = threading.Lock()
+
+
+def acquire_store(store_path: str) -> BaseStore:
+    """Return the process-wide store for the given path, creating it with create_store on first use."""
+    key = os.path.abspath(store_path)
+    with _open_stores_lock:
+        if key not in _open_stores:
+            _open_stores[key] = [create_store(store_path), 0]
+        _open_stores[key][1] += 1
+        return _open_stores[key][0]
+
+
+def release_store(store: BaseStore):
+    """Release a store returned by acquire_store, closing it when its last user releases it."""
+    with _open_stores_lock:
+        for key, entry in _open_stores.items():
+            if entry[0] is store:
+                entry[1] -= 1
+                if entry[1] > 0:
+                    return
+                del _open_stores[key]
+                break
+    store.close()
 
 
 class PersonalAssistant:
-    def __init__(self, user_id, llm):
+    def __init__(self, user_id, llm, store_path="data_store.json", checkpoint_path="checkpoints.db",
+                 checkpoints_per_thread=20, documents_path="documents.db"):
         self.llm = llm
+        self.store_path = store_path
+        self.documents_path = documents_path
+        self.checkpoint_path = checkpoint_path
+        self.checkpoints_per_thread = checkpoints_per_thread
+        self.checkpointer = None
         self.memory = None
         self.tools = None
         self.agent = None
         self.user = user_id
         self.config = {
             "configurable": {
-                "thread_id": "thread-1",
                 "user_id": f"{self.user}",
                 "system_prompt": (
                     "You are George Kour's personal assistant. "
@@ -80,80 +178,133 @@ class PersonalAssistant:
                 )
             }
         }
-        self.async_browser = None
         self.store = None
+        # Index of the uploaded documents, searched by the search_documents tool
+        self.documents = None
+        self.startup_timings = {}
+        self._background_startup = None
 
-    def initialize(self):
-        # Initialize Gmail credentials and toolkit
-        credentials = get_gmail_credentials(
-            token_file="token.json",
-            scopes=["https://mail.google.com/", "https://www.googleapis.com/auth/calendar.events",
-                    "https://www.googleapis.com/auth/drive"],
-            client_secrets_file=os.environ['GOOGLE_ACCOUNT_FILE'],
-        )
-        api_resource = build_resource_service(credentials=credentials)
-        api_resource_calendar = build_resource_service(service_name='calendar', service_version='v3',
-                                                       credentials=credentials)
+    def thread_config(self, thread_id: str) -> dict:
+        """Return the agent config for one conversation thread, so each thread has its own checkpoints."""
+        return {"configurable": {**self.config["configurable"], "thread_id": thread_id}}
 
-        #################
-        self.async_browser = create_async_playwright_browser()
-        browsing_toolkit = PlayWrightBrowserToolkit.from_browser(async_browser=self.async_browser)
+    def _assistant_tools(self) -> list:
+        # Memory and document tools are bound to this assistant's stores and user, and the interpreters keep
+        # state between runs, so they are not shared with other assistants; every other tool is a process-wide
+        # declaration whose stateless clients (Google services, browser, API wrappers) are built on first use
+        from langchain_community.tools.shell import ShellTool
+        return [
+            # PolicyCheckTool(policy_file='policy.md', llm=llm),
+            SaveMemoryTool(store=self.store, config=self.config),
+            SaveMemoriesTool(store=self.store, config=self.config),
+            DeleteMemoryTool(store=self.store, config=self.config),
+            SearchDocumentsTool(ingestor=self.documents, config=self.config),
+            ShellTool(ask_human_input=False),
+            PythonInterpreterTool(),
+        ]
 
-        ################
+    def _build_agent(self, tools: list):
+        self.tools = tools
 
-        # Initialize memory
-        # summary_llm = ChatOllama(model="llama3.2")
-        # self.memory = ConversationSummaryBufferMemory(llm=summary_llm, memory_key="chat_history", max_token_limit=200)
+        # policy_check_tool = PolicyCheckTool(policy_file='policy.md', llm=llm)
+        # self.tools = [wrap_tool_with_policy(tool, policy_check_tool, llm) for tool in self.tools]
 
-        # Initialize memory saver and LLM
+        # Create the agent
+        self.agent = create_react_agent(self.llm, tools=self.tools, store=self.store,
+                                        state_modifier=prepare_model_inputs,
+                                        checkpointer=self.checkpointer, debug=False)
 
-        memory_saver = MemorySaver()
+    def initialize(self):
+        # Persist agent checkpoints on disk, keeping only the most recent ones of each thread
+        self.checkpointer = SQLiteCheckpointSaver(db_path=self.checkpoint_path, keep_last=self.checkpoints_per_thread)
 
-        gmail_toolkit = GmailToolkit(api_resource=api_resource)
+        self.store = acquire_store(self.store_path)
+        self.documents = DocumentIngestor(db_path=self.documents_path)
 
-        self.store = JSONFileStore(file_path="data_store.json")
+        # Initialize tools
+        self._build_agent(tool_registry.tools() + self._assistant_tools())
 
-        save_memory_tool = SaveMemoryTool(store=self.store, config=self.config)
-        delete_memory_tool = DeleteMemoryTool(store=self.store, config=self.config)
+        print("Assistant initialized and ready!")
 
-        file_management_toolkit = FileManagementToolkit()
-        common_tools = load_tools(['wikipedia', 'arxiv', 'pubmed', 'google-scholar', 'stackexchange', 'human',
-                                   'google-serper', 'google-finance', 'reddit_search'])
+    async def ainitialize(self, ready_timeout: float = 2.0, warm_up: bool = True) -> dict:
+        """
+        Initialize the assistant, running independent setup steps concurrently.
 
-        # Initialize tools
-        self.tools = (
-                gmail_toolkit.get_tools() +
-                get_custom_gmail_tools(api_resource=api_resource,
-                                       api_resource_calendar=api_resource_calendar) +
-                file_management_toolkit.get_tools() +
-                # slack_toolkit.get_tools() +
-                browsing_toolkit.get_tools() +
-                common_tools +
-                [
-                    drive_tool,
-                    datetime_tool,
-                    PDFLoaderTool(),
-                    SemanticScholarQueryRun(),
-                    ShellTool(ask_human_input=False),
-                    PythonInterpreterTool(),
-                    # PolicyCheckTool(policy_file='policy.md', llm=llm),
-                    save_memory_tool,
-                    delete_memory_tool
-                ])
+        The stores, the checkpointer and every tool group are set up in parallel. The agent is created
+        as soon as the stores and checkpointer are ready, with the tool groups ready by then or within
+        ``ready_timeout`` seconds. Slower groups keep loading in the background and the agent is rebuilt
+        with the full toolset once they are ready. With ``warm_up``, the clients behind the tools are
+        then built in the background as well, so the first call of each tool does not pay for them.
 
-        # policy_check_tool = PolicyCheckTool(policy_file='policy.md', llm=llm)
-        # self.tools = [wrap_tool_with_policy(tool, policy_check_tool, llm) for tool in self.tools]
+        Args:
+            ready_timeout (float): Seconds to wait for tool groups before serving with a partial toolset.
+            warm_up (bool): Build the tools' clients in the background after startup.
 
-        # Create the agent
-        self.agent = create_react_agent(self.llm, tools=self.tools, store=self.store,
-                                        state_modifier=prepare_model_inputs,
-                                        checkpointer=memory_saver, debug=False)
+        Returns:
+            dict: Seconds taken by each setup step finished so far; updated as background steps finish.
+        """
+        self.startup_timings = {}
 
-        print("Assistant initialized and ready!")
+        async def timed(step: str, func, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await asyncio.to_thread(func, *args, **kwargs)
+            finally:
+                self.startup_timings[step] = round(time.perf_counter() - start, 3)
+
+        start = time.perf_counter()
+        group_tasks = {group: asyncio.create_task(timed(f"tools:{group}", tool_registry.tools, [group]))
+                       for group in tool_registry.groups()}
+        self.store, self.documents, self.checkpointer = await asyncio.gather(
+            timed("store", acquire_store, self.store_path),
+            timed("documents", DocumentIngestor, db_path=self.documents_path),
+            timed("checkpointer", SQLiteCheckpointSaver, db_path=self.checkpoint_path,
+                  keep_last=self.checkpoints_per_thread))
+        await asyncio.wait(group_tasks.values(), timeout=max(ready_timeout - (time.perf_counter() - start), 0))
+
+        ready = [group for group, task in group_tasks.items() if task.done() and not task.exception()]
+        pending = [group for group, task in group_tasks.items() if not task.done()]
+        for group, task in group_tasks.items():
+            if task.done() and task.exception():
+                print(f"[Warning] Failed to load the {group} tools: {task.exception()}")
+        assistant_tools = self._assistant_tools()
+        self._build_agent([tool for group in ready for tool in group_tasks[group].result()] + assistant_tools)
+        self.startup_timings["ready"] = round(time.perf_counter() - start, 3)
+
+        print(f"Assistant ready in {self.startup_timings['ready']}s with {len(self.tools)} tools"
+              + (f", still loading: {', '.join(pending)}" if pending else "")
+              + f". Step timings: {self.startup_timings}")
+        self._background_startup = asyncio.create_task(
+            self._finish_startup(group_tasks, pending, assistant_tools, warm_up))
+        return self.startup_timings
+
+    async def _finish_startup(self, group_tasks: dict, pending: list, assistant_tools: list, warm_up: bool):
+        """Add the tool groups that missed the startup deadline, then warm up the tools' clients."""
+        if pending:
+            await asyncio.wait([group_tasks[group] for group in pending])
+            for group in pending:
+                if group_tasks[group].exception():
+                    print(f"[Warning] Failed to load the {group} tools: {group_tasks[group].exception()}")
+            tools = [tool for task in group_tasks.values() if not task.exception() for tool in task.result()]
+            self._build_agent(tools + assistant_tools)
+            print(f"All tool groups loaded: {len(self.tools)} tools.")
+        if warm_up:
+            start = time.perf_counter()
+            failures = await warm_up_tools(self.tools)
+            self.startup_timings["warm_up"] = round(time.perf_counter() - start, 3)
+            for name, error in failures.items():
+                print(f"[Warning] Tool {name} is unavailable: {error}")
 
     async def cleanup(self):
         """Clean up resources."""
-        if self.async_browser:
-            await self.async_browser.close()  # Close the Playwright browser
-            print("Playwright browser closed.")
+        if self.store:
+            release_store(self.store)
+            self.store = None
+        if self.documents:
+            self.documents.close()
+        if self._background_startup and not self._background_startup.done():
+            self._background_startup.cancel()
+        if self.checkpointer:
+            self.checkpointer.close()
+        # The browser and other shared clients belong to the process: see shared_resources.aclose()
         print("All assistant resources have been cleaned up.")
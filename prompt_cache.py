@@ -0,0 +1,48 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class MemoryPromptCache:
+    """Caches the rendered system prompt per user, invalidated by a per-user memory version counter.
+
+    Memory tools call ``bump`` after every write, so an entry rendered before the write is never
+    served again. Within one user turn the ReAct loop asks for the same prompt on every step,
+    which is then answered without querying the store.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def version(self, user_id: str) -> int:
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def bump(self, user_id: str):
+        """Invalidate every cached prompt of the user."""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def get(self, user_id: str, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            cache_key = (user_id, self._versions.get(user_id, 0), key)
+            value = self._entries.get(cache_key)
+            if value is not None:
+                self._entries.move_to_end(cache_key)
+            return value
+
+    def put(self, user_id: str, key: Hashable, value: Any, version: int):
+        """Store a value rendered at the given version; values rendered before a bump are discarded."""
+        with self._lock:
+            if version != self._versions.get(user_id, 0):
+                return
+            self._entries[(user_id, version, key)] = value
+            self._entries.move_to_end((user_id, version, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+memory_prompt_cache = MemoryPromptCache()
@@ -1,28 +1,22 @@
 import os
+from functools import lru_cache
 from typing import List
 
 from langchain.agents import Tool
 from datetime import datetime
 
-from langchain_community.agent_toolkits import FileManagementToolkit
-from langchain_community.tools.gmail import get_gmail_credentials
-from langchain_community.tools.gmail.utils import build_resource_service
-from langchain_community.utilities.semanticscholar import SemanticScholarAPIWrapper
 from dotenv import load_dotenv
 from langchain_core.tools import BaseTool
-from langchain_googledrive.tools import GoogleDriveSearchTool
-from langchain_googledrive.utilities import GoogleDriveAPIWrapper
-
-from customtools.CreateCalendarEvent import GmailCreateCalendarEvent
-from customtools.FetchEventTool import GmailFetchCalendarEvents
-from customtools.GmailDeleteMessage import GmailDeleteMessage
-from customtools.GmailFlagImportantMessage import GmailFlagImportantMessage
-from customtools.GmailFlagMessage import GmailFlagMessage
 
 load_dotenv()
 
 # Define Wrappers
-semantic_scholar_wrapper = SemanticScholarAPIWrapper()
+
+
+@lru_cache(maxsize=None)
+def get_semantic_scholar_wrapper():
+    from langchain_community.utilities.semanticscholar import SemanticScholarAPIWrapper
+    return SemanticScholarAPIWrapper()
 
 # Define Tools
 
@@ -32,16 +26,21 @@ datetime_tool = Tool(
     description="Retrieve the current date and time."
 )
 
-api_wrapper = GoogleDriveAPIWrapper(
-    gdrive_api_file=os.environ['GOOGLE_ACCOUNT_FILE'],
-    folder_id='root',
-    num_results=20,
-    template="gdrive-query",
-    mode='documents',
-    recursive=True
-)
 
-drive_tool = GoogleDriveSearchTool(api_wrapper=api_wrapper)
+@lru_cache(maxsize=None)
+def get_drive_tool() -> BaseTool:
+    from langchain_googledrive.tools import GoogleDriveSearchTool
+    from langchain_googledrive.utilities import GoogleDriveAPIWrapper
+
+    api_wrapper = GoogleDriveAPIWrapper(
+        gdrive_api_file=os.environ['GOOGLE_ACCOUNT_FILE'],
+        folder_id='root',
+        num_results=20,
+        template="gdrive-query",
+        mode='documents',
+        recursive=True
+    )
+    return GoogleDriveSearchTool(api_wrapper=api_wrapper)
 
 #     drive_tools = load_tools(
 #     ["google_drive_search"],
@@ -50,8 +49,24 @@ drive_tool = GoogleDriveSearchTool(api_wrapper=api_wrapper)
 # )
 
 
+# The wrappers above are built on first access rather than at import, which keeps startup fast
+_LAZY_ATTRIBUTES = {"semantic_scholar_wrapper": get_semantic_scholar_wrapper, "drive_tool": get_drive_tool}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_custom_gmail_tools(api_resource, api_resource_calendar) -> List[BaseTool]:
     """Get the tools in the toolkit."""
+    from customtools.CreateCalendarEvent import GmailCreateCalendarEvent
+    from customtools.FetchEventTool import GmailFetchCalendarEvents
+    from customtools.GmailDeleteMessage import GmailDeleteMessage
+    from customtools.GmailFlagImportantMessage import GmailFlagImportantMessage
+    from customtools.GmailFlagMessage import GmailFlagMessage
+
     return [
         GmailFlagMessage(api_resource=api_resource),
         GmailDeleteMessage(api_resource=api_resource),
@@ -59,4 +74,3 @@ def get_custom_gmail_tools(api_resource, api_resource_calendar) -> List[BaseTool
         GmailCreateCalendarEvent(api_resource=api_resource_calendar),
         GmailFetchCalendarEvents(api_resource=api_resource_calendar),
     ]
-
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Hashable, Optional
+
+from conversation_history_manager import ConversationHistoryManager
+from conversation_manager import ConversationManager
+from personal_assistant import PersonalAssistant
+
+
+class ChatSession:
+    """The conversation of one chat, with a lock that keeps its messages processed in order."""
+
+    def __init__(self, chat_id: Hashable, conversation: ConversationManager):
+        self.chat_id = chat_id
+        self.conversation = conversation
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.users = 0  # Handlers holding or waiting for the session
+
+
+class ChatSessionPool:
+    """
+    Keeps one conversation per chat, so that chats have separate threads and run concurrently.
+
+    Messages of the same chat are processed one at a time, in arrival order. Sessions are persisted with
+    the ConversationHistoryManager after each turn under a stable ``<prefix>-<chat id>`` thread id, so an
+    evicted session resumes where it left off. Idle sessions are evicted least recently used first once
+    there are more than ``max_sessions``, and after ``idle_timeout`` seconds without messages.
+    """
+
+    def __init__(self, personal_assistant: PersonalAssistant, history_manager: ConversationHistoryManager,
+                 max_sessions: int = 100, idle_timeout: Optional[float] = 3600, thread_prefix: str = "telegram",
+                 loaded_turns: int = 20):
+        self.personal_assistant = personal_assistant
+        self.history_manager = history_manager
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.thread_prefix = thread_prefix
+        self.loaded_turns = loaded_turns
+        self._sessions = OrderedDict()  # chat id -> ChatSession, least recently used first
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def thread_id(self, chat_id: Hashable) -> str:
+        return f"{self.thread_prefix}-{chat_id}"
+
+    def _load(self, chat_id: Hashable) -> ChatSession:
+        thread_id = self.thread_id(chat_id)
+        conversation = self.history_manager.load(self.personal_assistant, self.personal_assistant.user, thread_id,
+                                                 last_n=self.loaded_turns)
+        if conversation.thread_id != thread_id:
+            # No saved conversation yet for this chat
+            conversation = ConversationManager(self.personal_assistant, thread_id=thread_id)
+        return ChatSession(chat_id, conversation)
+
+    @asynccontextmanager
+    async def session(self, chat_id: Hashable) -> AsyncIterator[ChatSession]:
+        """Hold the session of a chat, waiting for the chat's previous messages to be processed."""
+        session = self._sessions.get(chat_id)
+        if session is None:
+            session = self._sessions[chat_id] = self._load(chat_id)
+        self._sessions.move_to_end(chat_id)
+        session.users += 1
+        try:
+            async with session.lock:
+                yield session
+        finally:
+            session.users -= 1
+            session.last_used = time.monotonic()
+            self._evict()
+
+    def save(self, session: ChatSession):
+        if session.conversation.conversation_messages:
+            self.history_manager.save_conversation(session.conversation)
+
+    def discard(self, chat_id: Hashable):
+        """Forget the session of a chat once it is no longer in use; its saved history is kept."""
+        session = self._sessions.get(chat_id)
+        if session is not None and session.users == 0:
+            del self._sessions[chat_id]
+
+    def _evict(self):
+        now = time.monotonic()
+        for chat_id, session in list(self._sessions.items()):
+            over_capacity = len(self._sessions) > self.max_sessions
+            expired = self.idle_timeout is not None and now - session.last_used > self.idle_timeout
+            if not over_capacity and not expired:
+                break  # Sessions are ordered by last use, so the remaining ones are newer
+            if session.users == 0:
+                self.save(session)
+                del self._sessions[chat_id]
+
+    def close(self):
+        """Save and drop every session."""
+        for session in self._sessions.values():
+            self.save(session)
+        self._sessions.clear()
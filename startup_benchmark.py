@@ -0,0 +1,105 @@
+"""
+Measure and guard the cold-start time of the entry points.
+
+Each entry point's top-level imports are run in a fresh interpreter with ``-X importtime``, which gives
+the wall time of a cold start and the modules that dominate it.
+
+Usage:
+    python startup_benchmark.py            # measure and print the slowest imports
+    python startup_benchmark.py --record   # measure and save the results as the baseline
+    python startup_benchmark.py --check    # measure and fail if an entry point got slower than its baseline
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = ["app.py", "ConsoleRunner.py", "telegram_handler.py"]
+BASELINE_FILE = "startup_baseline.json"
+
+
+def entry_point_imports(path: str) -> str:
+    """The top-level import statements of a script, which is what its cold start pays for."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def parse_importtime(stderr: str, top: int) -> list[tuple[str, float]]:
+    """The slowest top-level imports of an ``-X importtime`` report, as (module, cumulative seconds)."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue  # The header line, or a module imported by another module
+        modules.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+
+
+def measure(path: str, runs: int = 3, top: int = 10) -> dict:
+    """Run the imports of an entry point ``runs`` times and return the median wall time and slowest imports."""
+    code = entry_point_imports(path)
+    durations, stderr = [], ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(path)))
+        durations.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+        stderr = result.stderr
+    return {"seconds": round(statistics.median(durations), 3), "slowest": parse_importtime(stderr, top)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entry_points", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--record", action="store_true", help=f"save the results to {BASELINE_FILE}")
+    parser.add_argument("--check", action="store_true", help="fail if slower than the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--slack", type=float, default=0.2, help="allowed absolute slowdown, in seconds")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    args = parser.parse_args()
+
+    results = {}
+    for path in args.entry_points:
+        results[path] = measure(path, runs=args.runs)
+        if "error" in results[path]:
+            print(f"[Error] {path}: {results[path]['error']}")
+            continue
+        print(f"{path}: {results[path]['seconds']:.3f}s")
+        for module, seconds in results[path]["slowest"]:
+            print(f"    {seconds:7.3f}s  {module}")
+
+    failed = any("error" in result for result in results.values())
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"[Error] No baseline at {args.baseline}; run with --record first.")
+            sys.exit(1)
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        for path, result in results.items():
+            if "error" in result or path not in baseline:
+                continue
+            limit = baseline[path]["seconds"] * (1 + args.tolerance) + args.slack
+            if result["seconds"] > limit:
+                print(f"[Error] {path} starts in {result['seconds']:.3f}s, over the {limit:.3f}s limit "
+                      f"(baseline {baseline[path]['seconds']:.3f}s).")
+                failed = True
+    if args.record:
+        recorded = {path: result for path, result in results.items() if "error" not in result}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(recorded, f, indent=2)
+        print(f"Baseline saved to {args.baseline}.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
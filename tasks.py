@@ -2,4 +2,14 @@ from invoke import task
 
 @task
 def install(c):
-    c.run("playwright install")
\ No newline at end of file
+    c.run("playwright install")
+
+@task
+def test(c):
+    c.run("python -m pytest -q tests")
+
+@task
+def startup_benchmark(c, record=False, check=False):
+    """Measure the cold-start time of the entry points; --record saves a baseline, --check guards it."""
+    flags = (" --record" if record else "") + (" --check" if check else "")
+    c.run(f"python startup_benchmark.py{flags}")
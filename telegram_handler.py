@@ -1,5 +1,6 @@
 # python
 import os
+import time
 import asyncio
 
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters
@@ -7,56 +8,125 @@ from dotenv import load_dotenv
 from sentinel import LLMSecretDetector, instrument_model_class
 from personal_assistant import PersonalAssistant
 from langchain_openai import AzureChatOpenAI
-from conversation_manager import ConversationManager
 from conversation_history_manager import ConversationHistoryManager
+from job_queue import FairJobQueue, QueueFull
+from session_pool import ChatSessionPool
+from tool_registry import shared_resources
+
+# Number of agent runs processed at once, and number of messages allowed to wait in total and per chat
+JOB_CONCURRENCY = 4
+MAX_PENDING_JOBS = 100
+MAX_PENDING_JOBS_PER_CHAT = 5
+
+
+class StreamingReply:
+    """Shows a streamed response in a single Telegram message that is edited as tokens arrive.
+
+    Edits are throttled to one per ``edit_interval`` seconds to stay within Telegram's rate limits.
+    """
+
+    MAX_MESSAGE_LENGTH = 4096
+
+    def __init__(self, message, edit_interval: float = 1.0):
+        self.message = message
+        self.edit_interval = edit_interval
+        self.text = ""
+        self.reply = None
+        self._last_edit = 0.0
+
+    async def __call__(self, event: dict):
+        if event["type"] == "token":
+            self.text += event["content"]
+        elif event["type"] == "tool_call":
+            self.text += f"\n🔧 {event['name']}…\n"
+        else:
+            return
+        if time.monotonic() - self._last_edit >= self.edit_interval:
+            await self._show(self.text)
+
+    async def _show(self, text: str):
+        text = text.strip()[-self.MAX_MESSAGE_LENGTH:]
+        if not text:
+            return
+        self._last_edit = time.monotonic()
+        try:
+            if self.reply is None:
+                self.reply = await self.message.reply_text(text)
+            elif text != self.reply.text:
+                self.reply = await self.reply.edit_text(text)
+        except Exception as e:
+            print(f"[Warning] Failed to update the streamed reply: {e}")
+
+    async def finish(self, text: str):
+        """Replace the streamed text with the final answer."""
+        await self._show(text)
 
 
 async def start(update, context):
     await update.message.reply_text("Hello! I am your personal assistant.")
 
 
+async def stop(update, context):
+    job_queue = context.application.bot_data['job_queue']
+    cancelled = job_queue.cancel(update.effective_chat.id)
+    await update.message.reply_text(f"Stopped {cancelled} request(s)." if cancelled else "Nothing to stop.")
+
+
 async def handle_message(update, context):
-    conv_manager = context.application.bot_data['conversation_manager']
-    history_manager = context.application.bot_data['conversation_history_manager']
+    """Queue the message, so that slow requests of one chat never hold up the other chats."""
+    job_queue = context.application.bot_data['job_queue']
+    try:
+        job = job_queue.submit(update.effective_chat.id, lambda: process_message(update, context))
+    except QueueFull:
+        await update.message.reply_text("I'm too busy right now, please try again in a moment.")
+        return
+    if job.position:
+        await update.message.reply_text(f"Busy, queued #{job.position}. Send /stop to cancel.")
+
+
+async def process_message(update, context):
+    session_pool = context.application.bot_data['session_pool']
     message = update.message
 
-    # Check if the message contains a document
-    if message.document:
-        # Download the file to a local 'downloads' directory
-        file = await message.document.get_file()
-        os.makedirs("downloads", exist_ok=True)
-        file_path = os.path.join("downloads", message.document.file_name)
-        await file.download_to_drive(custom_path=file_path)
+    # Messages of one chat are processed in order; different chats run concurrently
+    async with session_pool.session(update.effective_chat.id) as session:
+        conv_manager = session.conversation
+        streaming_reply = StreamingReply(message)
+
+        # Check if the message contains a document
+        if message.document:
+            # Download the file to a local 'downloads' directory
+            file = await message.document.get_file()
+            os.makedirs("downloads", exist_ok=True)
+            file_path = os.path.join("downloads", message.document.file_name)
+            await file.download_to_drive(custom_path=file_path)
+            try:
+                # The document is indexed page by page; the conversation only gets its summary
+                document_message = await conv_manager.ingest_document(file_path, message.document.file_name,
+                                                                      message.document.mime_type)
+            except Exception as e:
+                await update.message.reply_text(f"Could not read the file: {e}")
+                return
+            user_text = f"{message.caption}\n\n{document_message}" if message.caption else document_message
+        else:
+            # Process text input
+            user_text = message.text
+
         try:
-            if file.file_path.lower().endswith('.pdf'):
-                # If the file is a PDF, we will read its content
-                try:
-                    from langchain_community.document_loaders import PyPDFLoader
-                    loader = PyPDFLoader(file_path)
-                    docs = loader.load()
-                    file_content = "\n".join(doc.page_content for doc in docs)
-                except Exception as e:
-                    await update.message.reply_text(f"Could not read the PDF file: {e}")
-                    return
-            # Read file content (assuming it's a text file)
-            elif file.mime_type.startswith("text/") or file.type.endswith(".txt"):
-                with open(file_path, "r", encoding="utf-8") as f:
-                    file_content = f.read()
-
-            conversation_response = await conv_manager.process_input(file_content)
-        except Exception as e:
-            await update.message.reply_text(f"Could not read the file: {e}")
-            return
-    else:
-        # Process text input
-        user_text = message.text
-        conversation_response = await conv_manager.process_input(user_text)
+            conversation_response = await conv_manager.process_input(user_text, event_hook=streaming_reply)
+        except asyncio.CancelledError:
+            # Stopped with /stop: answer the interrupted tool calls before another message uses the thread
+            await conv_manager.close_interrupted_turn("Cancelled by /stop")
+            raise
+
+        session_pool.save(session)
+        if conversation_response is None:
+            await update.message.reply_text("Conversation ended. History saved.")
+        else:
+            await streaming_reply.finish(conversation_response[-1].content)
 
     if conversation_response is None:
-        history_manager.save_conversation(conv_manager)
-        await update.message.reply_text("Conversation ended. History saved.")
-    else:
-        await update.message.reply_text(conversation_response[-1].content)
+        session_pool.discard(update.effective_chat.id)
 
 
 async def main():
@@ -69,25 +139,33 @@ async def main():
 
     # Initialize PersonalAssistant
     assistant = PersonalAssistant(user_id='gkour', llm=llm)
-    await assistant.initialize()
+    await assistant.ainitialize()
 
     token = os.environ.get("TELEGRAM_BOT_TOKEN")
-    app = ApplicationBuilder().token(token).build()
+    # Updates are handled concurrently; the session pool keeps each chat's messages in order
+    app = ApplicationBuilder().token(token).concurrent_updates(True).build()
 
-    # Create conversation managers and save them in bot_data
-    conv_manager = ConversationManager(assistant)
+    # Give every chat its own conversation thread and save them in bot_data
     history_manager = ConversationHistoryManager()
+    session_pool = ChatSessionPool(assistant, history_manager)
+    job_queue = FairJobQueue(concurrency=JOB_CONCURRENCY, max_pending=MAX_PENDING_JOBS,
+                             max_pending_per_user=MAX_PENDING_JOBS_PER_CHAT)
     app.bot_data['assistant'] = assistant
-    app.bot_data['conversation_manager'] = conv_manager
+    app.bot_data['job_queue'] = job_queue
+    app.bot_data['session_pool'] = session_pool
     app.bot_data['conversation_history_manager'] = history_manager
 
     # Add handlers for commands and messages
     app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("stop", stop))
     app.add_handler(MessageHandler(filters.TEXT | filters.Document.ALL & ~filters.COMMAND, handle_message))
 
     print("Bot is polling...")
     await app.run_polling()
+    session_pool.close()
     await assistant.cleanup()
+    await shared_resources.aclose()
+    history_manager.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,44 @@
+import asyncio
+
+from job_queue import FairJobQueue
+
+
+def test_positions_match_the_order_jobs_run_in():
+    async def scenario():
+        queue = FairJobQueue(concurrency=1)
+        release = asyncio.Event()
+        started = []
+
+        def job(name):
+            async def run():
+                started.append(name)
+                await release.wait()
+            return run
+
+        first = queue.submit("alice", job("alice-1"))
+        await asyncio.sleep(0)
+        queued = [queue.submit("alice", job("alice-2")), queue.submit("bob", job("bob-1")),
+                  queue.submit("bob", job("bob-2"))]
+        release.set()
+        await queue.join()
+        return first, queued, started
+
+    first, queued, started = asyncio.run(scenario())
+    assert first.position == 0
+    # Alice's running job is not in line, so her next job is first
+    assert [job.position for job in queued] == [1, 2, 3]
+    assert started == ["alice-1", "alice-2", "bob-1", "bob-2"]
+
+
+def test_next_job_of_a_busy_chat_is_first_in_line():
+    async def scenario():
+        queue = FairJobQueue(concurrency=2)
+        release = asyncio.Event()
+        queue.submit("alice", release.wait)
+        await asyncio.sleep(0)
+        job = queue.submit("alice", release.wait)
+        release.set()
+        await queue.join()
+        return job
+
+    assert asyncio.run(scenario()).position == 1
@@ -0,0 +1,159 @@
+import json
+import os
+
+import pytest
+
+import JsonFileStore as json_file_store
+from JsonFileStore import JSONFileStore
+
+NAMESPACE = ("memories", "user")
+
+
+def open_store(tmp_path, **kwargs) -> JSONFileStore:
+    return JSONFileStore(file_path=str(tmp_path / "store.json"), wal=True, **kwargs)
+
+
+def stored_data(store: JSONFileStore) -> dict:
+    return {key: store.get(NAMESPACE, key) for key in ("a", "b", "c", "d")}
+
+
+def snapshot_items(data: dict) -> dict:
+    return {key: value for namespace, key, value in json_file_store.iter_json_items(data) if namespace == NAMESPACE}
+
+
+def test_wal_replay_restores_puts_and_deletes(tmp_path):
+    store = open_store(tmp_path)
+    store.put(NAMESPACE, "a", {"data": "1"})
+    store.put(NAMESPACE, "b", {"data": "2"})
+    store.put(NAMESPACE, "a", {"data": "3"})
+    store.delete(NAMESPACE, "b")
+    store.close()
+    assert not os.path.exists(store.file_path)  # Nothing compacted yet: the data is only in the log
+
+    reopened = open_store(tmp_path)
+    assert stored_data(reopened) == {"a": {"data": "3"}, "b": None, "c": None, "d": None}
+    reopened.close()
+
+
+def test_wal_replay_skips_a_torn_final_record(tmp_path):
+    store = open_store(tmp_path)
+    store.put(NAMESPACE, "a", {"data": "1"})
+    store.close()
+    with open(store.wal_path, "a") as wal:
+        wal.write('{"op":"put","ns":["memories","user"],"key":"b","val')
+
+    reopened = open_store(tmp_path)
+    assert stored_data(reopened)["a"] == {"data": "1"}
+    assert stored_data(reopened)["b"] is None
+    reopened.close()
+
+
+def test_compaction_round_trip(tmp_path):
+    store = open_store(tmp_path, compact_threshold=1000)
+    for i in range(10):
+        store.put(NAMESPACE, "a", {"data": str(i)})
+    store.put(NAMESPACE, "b", {"data": "b"})
+    store.compact()
+    store.put(NAMESPACE, "c", {"data": "c"})
+    store.close()
+
+    with open(store.file_path) as snapshot:
+        assert snapshot_items(json.load(snapshot)) == {"a": {"data": "9"}, "b": {"data": "b"}}
+    assert not os.path.exists(f"{store.wal_path}.compacting")
+
+    reopened = open_store(tmp_path)
+    assert stored_data(reopened) == {"a": {"data": "9"}, "b": {"data": "b"}, "c": {"data": "c"}, "d": None}
+    reopened.close()
+
+
+def test_background_compaction_round_trip(tmp_path):
+    store = open_store(tmp_path, compact_threshold=5)
+    for i in range(23):
+        store.put(NAMESPACE, "a" if i % 2 else "b", {"data": str(i)})
+    store.close()
+
+    reopened = open_store(tmp_path)
+    assert stored_data(reopened) == {"a": {"data": "21"}, "b": {"data": "22"}, "c": None, "d": None}
+    assert reopened._wal_records < 23
+    reopened.close()
+
+
+def test_interrupted_compaction_is_finished_on_startup(tmp_path):
+    store = open_store(tmp_path)
+    store.put(NAMESPACE, "a", {"data": "1"})
+    store.flush()
+    # Crash after the log was rotated but before the snapshot was written
+    store._wal_file.close()
+    store._wal_file = None
+    os.replace(store.wal_path, f"{store.wal_path}.compacting")
+    store.put(NAMESPACE, "b", {"data": "2"})
+    store.close()
+
+    reopened = open_store(tmp_path)
+    assert stored_data(reopened) == {"a": {"data": "1"}, "b": {"data": "2"}, "c": None, "d": None}
+    assert not os.path.exists(f"{store.wal_path}.compacting")
+    with open(store.file_path) as snapshot:
+        assert snapshot_items(json.load(snapshot)) == {"a": {"data": "1"}, "b": {"data": "2"}}
+    reopened.close()
+
+
+def test_second_crash_during_compaction_keeps_the_earlier_log(tmp_path, monkeypatch):
+    store = open_store(tmp_path)
+    store.put(NAMESPACE, "a", {"data": "1"})
+    store.flush()
+    # First crash: the rotated log of an unfinished compaction is left behind
+    store._wal_file.close()
+    store._wal_file = None
+    os.replace(store.wal_path, f"{store.wal_path}.compacting")
+    store.put(NAMESPACE, "b", {"data": "2"})
+    store.flush()
+
+    # Second crash: the next compaction dies before its snapshot replaces the old one
+    def failing_replace(source, target):
+        if target == store.file_path:
+            raise OSError("simulated crash")
+        return os.rename(source, target)
+    monkeypatch.setattr(json_file_store.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        store.compact()
+    monkeypatch.undo()
+
+    reopened = open_store(tmp_path)
+    assert stored_data(reopened) == {"a": {"data": "1"}, "b": {"data": "2"}, "c": None, "d": None}
+    reopened.close()
+
+
+@pytest.mark.parametrize("wal", [False, True])
+def test_reload_keeps_items_whose_values_look_like_namespaces(tmp_path, wal):
+    store = JSONFileStore(file_path=str(tmp_path / "store.json"), wal=wal)
+    store.put(("prefs", "u1"), "profile", {"address": {"city": "Haifa"}})
+    store.put(("prefs", "u1"), "empty", {})
+    store.put(("prefs", "u1"), "theme", {"data": "dark"})
+    store.put(("prefs", "u1", "devices"), "phone", {"data": "android"})
+    store.put(("prefs", "u2"), "theme", {"data": "light"})
+    if wal:
+        store.compact()
+    store.close()
+
+    reopened = JSONFileStore(file_path=str(tmp_path / "store.json"), wal=wal)
+    assert reopened.get(("prefs", "u1"), "profile") == {"address": {"city": "Haifa"}}
+    assert reopened.get(("prefs", "u1"), "empty") == {}
+    assert reopened.get(("prefs", "u1"), "theme") == {"data": "dark"}
+    assert reopened.get(("prefs", "u1", "devices"), "phone") == {"data": "android"}
+    assert reopened.get(("prefs", "u2"), "theme") == {"data": "light"}
+    assert sorted(reopened.list_namespaces()) == [("prefs", "u1"), ("prefs", "u1", "devices"), ("prefs", "u2")]
+    reopened.close()
+
+
+def test_legacy_nested_file_is_read_and_rewritten_in_the_current_format(tmp_path):
+    path = tmp_path / "store.json"
+    path.write_text(json.dumps({"memories": {"user": {"a": {"data": "1"}, "b": {"data": "2"}}}}))
+
+    store = JSONFileStore(file_path=str(path))
+    assert stored_data(store) == {"a": {"data": "1"}, "b": {"data": "2"}, "c": None, "d": None}
+    store.put(NAMESPACE, "c", {"data": "3"})
+    store.close()
+
+    data = json.loads(path.read_text())
+    assert data["__format__"] == json_file_store.STORE_FORMAT
+    assert snapshot_items(data) == {"a": {"data": "1"}, "b": {"data": "2"}, "c": {"data": "3"}}
@@ -0,0 +1,24 @@
+from personal_assistant import acquire_store, release_store
+
+NAMESPACE = ("memories", "user")
+
+
+def test_sessions_on_one_store_path_keep_each_others_writes(tmp_path):
+    store_path = str(tmp_path / "store.json")
+    first, second = acquire_store(store_path), acquire_store(store_path)
+    assert first is second
+
+    for i in range(10):
+        first.put(NAMESPACE, f"first-{i}", {"data": str(i)})
+        second.put(NAMESPACE, f"second-{i}", {"data": str(i)})
+    second.compact()
+    release_store(first)
+    second.put(NAMESPACE, "after-release", {"data": "x"})
+    release_store(second)
+
+    reopened = acquire_store(store_path)
+    try:
+        keys = {item["key"] for item in reopened.search(NAMESPACE, limit=100)}
+    finally:
+        release_store(reopened)
+    assert keys == {f"first-{i}" for i in range(10)} | {f"second-{i}" for i in range(10)} | {"after-release"}
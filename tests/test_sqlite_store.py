@@ -0,0 +1,37 @@
+import json
+
+from JsonFileStore import JSONFileStore
+from SQLiteStore import SQLiteStore, migrate_json_store
+
+
+def test_migration_copies_every_item_whatever_its_value(tmp_path):
+    json_path, db_path = str(tmp_path / "store.json"), str(tmp_path / "store.db")
+    json_store = JSONFileStore(file_path=json_path, wal=True)
+    json_store.put(("prefs", "u1"), "profile", {"address": {"city": "Haifa"}})
+    json_store.put(("prefs", "u1"), "empty", {})
+    json_store.put(("prefs", "u1", "devices"), "phone", {"data": "android"})
+    json_store.put(("prefs", "u2"), "theme", {"data": "light"})
+    json_store.compact()
+    json_store.put(("memories", "u1"), "m1", {"data": "only in the log"})
+    json_store.close()
+
+    assert migrate_json_store(json_path, db_path) == 5
+    assert migrate_json_store(json_path, db_path) == 0  # Existing rows are left untouched
+
+    sqlite_store = SQLiteStore(db_path=db_path)
+    assert sqlite_store.get(("prefs", "u1"), "profile") == {"address": {"city": "Haifa"}}
+    assert sqlite_store.get(("prefs", "u1"), "empty") == {}
+    assert sqlite_store.get(("prefs", "u1", "devices"), "phone") == {"data": "android"}
+    assert sqlite_store.get(("prefs", "u2"), "theme") == {"data": "light"}
+    assert sqlite_store.get(("memories", "u1"), "m1") == {"data": "only in the log"}
+    sqlite_store.close()
+
+
+def test_migration_reads_the_legacy_nested_layout(tmp_path):
+    json_path, db_path = tmp_path / "store.json", str(tmp_path / "store.db")
+    json_path.write_text(json.dumps({"memories": {"u1": {"a": {"data": "1"}, "b": {"data": "2"}}}}))
+
+    assert migrate_json_store(str(json_path), db_path) == 2
+    sqlite_store = SQLiteStore(db_path=db_path)
+    assert [item["key"] for item in sqlite_store.search(("memories", "u1"))] == ["a", "b"]
+    sqlite_store.close()
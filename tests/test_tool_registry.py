@@ -0,0 +1,37 @@
+from typing import Optional
+
+from langchain_core.callbacks import CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
+
+from tool_registry import LazyTool
+
+
+class SearchRun(BaseTool):
+    """A tool that, like GoogleSerperRun or PubmedQueryRun, has no class-level args_schema."""
+
+    name: str = "search"
+    description: str = "Search the web."
+
+    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
+        return f"results for {query}"
+
+
+def test_lazy_tool_declares_the_arguments_of_the_real_tool():
+    tool = LazyTool.from_class(SearchRun, SearchRun)
+    assert set(tool.args) == {"query"}
+
+
+def test_lazy_tool_without_class_schema_runs_with_its_real_arguments():
+    built = []
+    tool = LazyTool.from_class(SearchRun, lambda: built.append(1) or SearchRun())
+    assert not built
+    assert tool.invoke({"query": "langgraph"}) == "results for langgraph"
+    assert tool.invoke({"name": "search", "args": {"query": "pubmed"}, "id": "call-1",
+                        "type": "tool_call"}).content == "results for pubmed"
+    assert built == [1]
+
+
+def test_lazy_integration_tools_expose_their_query_argument():
+    from langchain_community.tools import GoogleSerperRun, PubmedQueryRun
+    for tool_class in (GoogleSerperRun, PubmedQueryRun):
+        assert set(LazyTool.from_class(tool_class, tool_class).args) == {"query"}
@@ -0,0 +1,128 @@
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage, trim_messages
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the tiktoken encoding once; None when tiktoken is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens of a text with tiktoken, or estimate ~4 characters per token without it."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: list[BaseMessage]) -> int:
+    """Count the tokens of a list of messages, including tool call arguments and a small per-message overhead."""
+    total = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        total += 4 + count_tokens(content)
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            total += count_tokens(f"{tool_call.get('name', '')}{tool_call.get('args', '')}")
+    return total
+
+
+class TokenBudget:
+    """Splits an input token budget between the system prompt, ranked memories and recent messages.
+
+    The system prompt is always kept. Memories take at most ``memory_share`` of what remains, in rank
+    order, and the most recent messages fill the rest; older messages that do not fit are dropped.
+    The current turn, from the last human message on, is always kept whole so that no tool call is separated
+    from its result; if it does not fit, its tool results are truncated instead.
+    """
+
+    # Room left for the note appended to a truncated tool result
+    TRUNCATION_NOTE_TOKENS = 20
+
+    def __init__(self, max_input_tokens: int = 32000, memory_share: float = 0.15):
+        self.max_input_tokens = max_input_tokens
+        self.memory_share = memory_share
+
+    def select_memories(self, system_prompt: str, memories: list[str]) -> tuple[list[str], int, int]:
+        """Return the memories that fit, the system prompt tokens and the memory tokens."""
+        system_tokens = count_tokens(system_prompt)
+        memory_budget = int(max(self.max_input_tokens - system_tokens, 0) * self.memory_share)
+        selected, memory_tokens = [], 0
+        for memory in memories:
+            tokens = count_tokens(memory) + 1
+            if memory_tokens + tokens > memory_budget:
+                break
+            selected.append(memory)
+            memory_tokens += tokens
+        return selected, system_tokens, memory_tokens
+
+    def trim_messages(self, messages: list[BaseMessage], used_tokens: int) -> list[BaseMessage]:
+        """Keep the most recent messages that fit in the budget left after the system prompt and memories."""
+        available = self.max_input_tokens - used_tokens
+        if count_message_tokens(messages) <= available:
+            return messages
+        trimmed = trim_messages(messages, max_tokens=max(available, 0), token_counter=count_message_tokens,
+                                strategy="last", start_on="human", include_system=False, allow_partial=False)
+        turn_start = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+        if len(trimmed) >= len(messages) - turn_start:
+            return trimmed
+        return self.fit_turn(messages[turn_start:], available)
+
+    def fit_turn(self, turn: list[BaseMessage], available: int) -> list[BaseMessage]:
+        """
+        Truncate the tool results of a turn so that the turn fits in ``available`` tokens.
+
+        The smallest results are kept whole first and the larger ones share what is left, so a single
+        huge result (e.g. a whole PDF) does not crowd out the others. Other messages are not changed.
+
+        Args:
+            turn (list[BaseMessage]): The messages of the turn, starting with its human message.
+            available (int): The token budget of the turn.
+
+        Returns:
+            list[BaseMessage]: The turn, with copies of the truncated tool messages.
+        """
+        tool_indexes = [i for i, m in enumerate(turn) if isinstance(m, ToolMessage) and isinstance(m.content, str)]
+        remaining = available - count_message_tokens([m for i, m in enumerate(turn) if i not in tool_indexes])
+        sizes = {i: count_tokens(turn[i].content) for i in tool_indexes}
+        fitted = list(turn)
+        for left, i in enumerate(sorted(tool_indexes, key=sizes.get)):
+            share = max(remaining // (len(tool_indexes) - left) - 4, 0)
+            if sizes[i] > share:
+                content = turn[i].content
+                keep = len(content) * max(share - self.TRUNCATION_NOTE_TOKENS, 0) // sizes[i]
+                fitted[i] = turn[i].model_copy(update={"content": content[:keep] + (
+                    f"\n[... {len(content) - keep} characters truncated to fit the context]")})
+                share = count_tokens(fitted[i].content)
+            remaining -= min(sizes[i], share) + 4
+        return fitted
+
+
+class TokenUsageLog:
+    """A bounded, thread-safe log of the input token counts of recent model calls, for monitoring."""
+
+    def __init__(self, maxlen: int = 1000):
+        self._entries = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, user_id: str, thread_id: Optional[str], usage: dict):
+        with self._lock:
+            self._entries.append({"user_id": user_id, "thread_id": thread_id, **usage})
+
+    def recent(self, user_id: Optional[str] = None, limit: int = 20) -> list[dict]:
+        with self._lock:
+            entries = [e for e in self._entries if user_id is None or e["user_id"] == user_id]
+        return entries[-limit:]
+
+
+token_usage_log = TokenUsageLog()
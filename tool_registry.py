@@ -0,0 +1,288 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Optional, Type
+
+from langchain_core.tools import BaseTool
+from langchain_core.tools.base import create_schema_from_function
+from pydantic import PrivateAttr
+from pydantic_core import PydanticUndefined
+
+GOOGLE_SCOPES = ["https://mail.google.com/", "https://www.googleapis.com/auth/calendar.events",
+                 "https://www.googleapis.com/auth/drive"]
+
+
+class SharedResources:
+    """Process-wide pool of heavy clients (Google API services, HTTP wrappers, the browser).
+
+    Each resource is built once, on first request, and then shared by every assistant of the process.
+    """
+
+    def __init__(self):
+        self._resources = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._browsers = {}  # event loop -> (playwright, browser) launched in it
+        self._browser_locks = weakref.WeakKeyDictionary()  # asyncio locks belong to one loop too
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the named resource, building it with ``factory`` the first time."""
+        if name in self._resources:
+            return self._resources[name]
+        # One lock per resource, so that different resources are built concurrently
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._resources:
+                self._resources[name] = factory()
+            return self._resources[name]
+
+    def google_credentials(self):
+        from langchain_community.tools.gmail import get_gmail_credentials
+        return self.get("google_credentials", lambda: get_gmail_credentials(
+            token_file="token.json", scopes=GOOGLE_SCOPES, client_secrets_file=os.environ['GOOGLE_ACCOUNT_FILE']))
+
+    def gmail_service(self):
+        from langchain_community.tools.gmail.utils import build_resource_service
+        return self.get("gmail_service", lambda: build_resource_service(credentials=self.google_credentials()))
+
+    def calendar_service(self):
+        from langchain_community.tools.gmail.utils import build_resource_service
+        return self.get("calendar_service", lambda: build_resource_service(
+            service_name='calendar', service_version='v3', credentials=self.google_credentials()))
+
+    async def browser(self):
+        """Return the Playwright browser of the running event loop, launching it there on first use.
+
+        Playwright objects are bound to the loop that created them, so each event loop gets its own
+        browser, shared by the tools running in it. Concurrent callers (e.g. the browser tools being
+        warmed up together) wait for a single launch. A loop that ends before the process, such as a
+        Streamlit turn run with ``asyncio.run``, must call ``close_browser`` first, or its browser and
+        Playwright driver are left running.
+        """
+        loop = asyncio.get_running_loop()
+        if loop in self._browsers:
+            return self._browsers[loop][1]
+        with self._lock:
+            for other in [other for other in self._browsers if other.is_closed()]:
+                del self._browsers[other]
+                print("[Warning] A Playwright browser was left open by a closed event loop.")
+            lock = self._browser_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            if loop not in self._browsers:
+                from playwright.async_api import async_playwright
+                playwright = await async_playwright().start()
+                try:
+                    browser = await playwright.chromium.launch(headless=True)
+                except Exception:
+                    await playwright.stop()
+                    raise
+                self._browsers[loop] = (playwright, browser)
+        return self._browsers[loop][1]
+
+    async def close_browser(self):
+        """Close the browser launched in the running event loop, if any, and stop its Playwright driver."""
+        with self._lock:
+            launched = self._browsers.pop(asyncio.get_running_loop(), None)
+        if launched is not None:
+            playwright, browser = launched
+            try:
+                await browser.close()
+            finally:
+                await playwright.stop()
+            print("Playwright browser closed.")
+
+    async def aclose(self):
+        """Close the browser of the running loop and forget every pooled resource."""
+        await self.close_browser()
+        with self._lock:
+            self._resources.clear()
+
+
+shared_resources = SharedResources()
+
+
+class LazyTool(BaseTool):
+    """A tool declared by its name, description and arguments schema, and built on first use.
+
+    The model only needs the declaration to call the tool, so constructing the real tool and its
+    clients is deferred until the tool actually runs. Calls are delegated to the real tool.
+    Tools built by ``afactory`` hold loop-bound clients (e.g. the browser), so they are built once per
+    event loop, such as each Streamlit turn run with ``asyncio.run``, and dropped with their loop.
+    """
+
+    factory: Optional[Callable[[], BaseTool]] = None
+    afactory: Optional[Callable[[], Awaitable[BaseTool]]] = None
+    _tool: Optional[BaseTool] = PrivateAttr(default=None)
+    _loop_tools: Any = PrivateAttr(default_factory=weakref.WeakKeyDictionary)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def from_class(cls, tool_class: Type[BaseTool], factory: Optional[Callable[[], BaseTool]] = None,
+                   afactory: Optional[Callable[[], Awaitable[BaseTool]]] = None, **overrides) -> "LazyTool":
+        """Declare a tool from the class defaults of ``tool_class`` without instantiating it.
+
+        Classes without a default ``args_schema`` get the schema the tool itself would use, built from
+        the signature of their ``_run``; LazyTool's own ``_run`` only takes ``*args, **kwargs``.
+        """
+        declaration = {}
+        for field in ("name", "description", "args_schema", "return_direct"):
+            info = tool_class.model_fields.get(field)
+            if info is not None and info.default is not PydanticUndefined:
+                declaration[field] = info.default
+        declaration.update(overrides)
+        if declaration.get("args_schema") is None:
+            declaration["args_schema"] = create_schema_from_function(
+                declaration.get("name", tool_class.__name__), tool_class._run)
+        return cls(factory=factory, afactory=afactory, **declaration)
+
+    def get_tool(self) -> BaseTool:
+        if self._tool is None:
+            if self.factory is None:
+                raise NotImplementedError(f"Tool {self.name} can only be used asynchronously.")
+            with self._lock:
+                if self._tool is None:
+                    self._tool = self.factory()
+        return self._tool
+
+    async def aget_tool(self) -> BaseTool:
+        if self.afactory is not None:
+            loop = asyncio.get_running_loop()
+            tool = self._loop_tools.get(loop)
+            if tool is None:
+                tool = await self.afactory()
+                with self._lock:
+                    tool = self._loop_tools.setdefault(loop, tool)
+            return tool
+        if self._tool is None:
+            await asyncio.to_thread(self.get_tool)
+        return self._tool
+
+    @staticmethod
+    def _tool_input(args: tuple, kwargs: dict):
+        return kwargs if kwargs or not args else args[0]
+
+    def _run(self, *args, run_manager=None, **kwargs):
+        callbacks = run_manager.get_child() if run_manager else None
+        return self.get_tool().run(self._tool_input(args, kwargs), callbacks=callbacks)
+
+    async def _arun(self, *args, run_manager=None, **kwargs):
+        tool = await self.aget_tool()
+        callbacks = run_manager.get_child() if run_manager else None
+        return await tool.arun(self._tool_input(args, kwargs), callbacks=callbacks)
+
+
+class ToolRegistry:
+    """Process-wide catalogue of tool groups.
+
+    A group is registered with a function returning its tool declarations. The declarations are
+    created once per process, the first time the group is requested, and shared by all assistants;
+    the tools behind them are built on first use (see LazyTool).
+    """
+
+    def __init__(self):
+        self._declarers = {}
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def register(self, group: str, declare: Callable[[], list[BaseTool]]):
+        self._declarers[group] = declare
+
+    def groups(self) -> list[str]:
+        return list(self._declarers)
+
+    def tools(self, groups: Optional[list[str]] = None) -> list[BaseTool]:
+        """Return the tools of the given groups (all groups when None), in registration order."""
+        tools = []
+        for group in groups if groups is not None else list(self._declarers):
+            if group not in self._groups:
+                with self._lock:
+                    if group not in self._groups:
+                        self._groups[group] = self._declarers[group]()
+            tools.extend(self._groups[group])
+        return tools
+
+
+async def warm_up_tools(tools: list[BaseTool]) -> dict[str, Exception]:
+    """Build the real tools behind the lazy ones concurrently; return the errors of those that failed."""
+    lazy_tools = [tool for tool in tools if isinstance(tool, LazyTool)]
+    results = await asyncio.gather(*(tool.aget_tool() for tool in lazy_tools), return_exceptions=True)
+    return {tool.name: result for tool, result in zip(lazy_tools, results) if isinstance(result, Exception)}
+
+
+def _declare_gmail_tools() -> list[BaseTool]:
+    from langchain_community.tools.gmail import (GmailCreateDraft, GmailGetMessage, GmailGetThread, GmailSearch,
+                                                 GmailSendMessage)
+    from customtools.GmailDeleteMessage import GmailDeleteMessage
+    from customtools.GmailFlagImportantMessage import GmailFlagImportantMessage
+    from customtools.GmailFlagMessage import GmailFlagMessage
+    tool_classes = [GmailCreateDraft, GmailSendMessage, GmailSearch, GmailGetMessage, GmailGetThread,
+                    GmailFlagMessage, GmailDeleteMessage, GmailFlagImportantMessage]
+    return [LazyTool.from_class(tool_class, lambda tool_class=tool_class: tool_class(
+        api_resource=shared_resources.gmail_service())) for tool_class in tool_classes]
+
+
+def _declare_calendar_tools() -> list[BaseTool]:
+    from customtools.CreateCalendarEvent import GmailCreateCalendarEvent
+    from customtools.FetchEventTool import GmailFetchCalendarEvents
+    return [LazyTool.from_class(tool_class, lambda tool_class=tool_class: tool_class(
+        api_resource=shared_resources.calendar_service()))
+        for tool_class in (GmailCreateCalendarEvent, GmailFetchCalendarEvents)]
+
+
+def _declare_file_tools() -> list[BaseTool]:
+    from langchain_community.agent_toolkits import FileManagementToolkit
+    return FileManagementToolkit().get_tools()
+
+
+def _declare_browser_tools() -> list[BaseTool]:
+    from langchain_community.tools.playwright import (ClickTool, CurrentWebPageTool, ExtractHyperlinksTool,
+                                                      ExtractTextTool, GetElementsTool, NavigateBackTool,
+                                                      NavigateTool)
+
+    def afactory(tool_class):
+        async def build():
+            return tool_class.from_browser(async_browser=await shared_resources.browser())
+        return build
+
+    return [LazyTool.from_class(tool_class, afactory=afactory(tool_class))
+            for tool_class in (ClickTool, NavigateTool, NavigateBackTool, ExtractTextTool, ExtractHyperlinksTool,
+                               GetElementsTool, CurrentWebPageTool)]
+
+
+def _declare_search_tools() -> list[BaseTool]:
+    from langchain_community.agent_toolkits.load_tools import load_tools
+    from langchain_community.tools import (ArxivQueryRun, GoogleSerperRun, HumanInputRun, PubmedQueryRun,
+                                           RedditSearchRun, StackExchangeTool, WikipediaQueryRun)
+    from langchain_community.tools.google_finance import GoogleFinanceQueryRun
+    from langchain_community.tools.google_scholar import GoogleScholarQueryRun
+    integrations = [("wikipedia", WikipediaQueryRun), ("arxiv", ArxivQueryRun), ("pubmed", PubmedQueryRun),
+                    ("google-scholar", GoogleScholarQueryRun), ("stackexchange", StackExchangeTool),
+                    ("human", HumanInputRun), ("google-serper", GoogleSerperRun),
+                    ("google-finance", GoogleFinanceQueryRun), ("reddit_search", RedditSearchRun)]
+    return [LazyTool.from_class(tool_class, lambda name=name: load_tools([name])[0])
+            for name, tool_class in integrations]
+
+
+def _declare_utility_tools() -> list[BaseTool]:
+    from langchain_community.tools.semanticscholar import SemanticScholarQueryRun
+    from langchain_googledrive.tools import GoogleDriveSearchTool
+    from customtools.PDFLoader import PDFLoaderTool
+    from ready_tools import datetime_tool, get_drive_tool
+
+    return [
+        LazyTool.from_class(GoogleDriveSearchTool, get_drive_tool),
+        datetime_tool,
+        PDFLoaderTool(),
+        LazyTool.from_class(SemanticScholarQueryRun, SemanticScholarQueryRun),
+    ]
+
+
+tool_registry = ToolRegistry()
+tool_registry.register("gmail", _declare_gmail_tools)
+tool_registry.register("calendar", _declare_calendar_tools)
+tool_registry.register("files", _declare_file_tools)
+tool_registry.register("browser", _declare_browser_tools)
+tool_registry.register("search", _declare_search_tools)
+tool_registry.register("utilities", _declare_utility_tools)
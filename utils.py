@@ -1,30 +1,128 @@
-async def process_stream(stream, add_message=None):
+import inspect
+from enum import IntEnum
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage, convert_to_messages
+
+
+class EchoLevel(IntEnum):
+    """How much of a streamed conversation is echoed to the console."""
+    OFF = 0  # Nothing
+    BRIEF = 1  # One line per message, with long contents truncated
+    FULL = 2  # Every message pretty-printed in full
+
+
+def console_print_message(message, level: EchoLevel = EchoLevel.FULL, max_chars: int = 200):
+    if level == EchoLevel.OFF:
+        return
+    if isinstance(message, tuple):
+        print(message)  # Print the tuple message
+    elif level == EchoLevel.FULL:
+        message.pretty_print()  # Pretty print other message types
+    else:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if len(content) > max_chars:
+            content = f"{content[:max_chars]}… [{len(content)} chars]"
+        tool_calls = ", ".join(tool_call["name"] for tool_call in getattr(message, "tool_calls", None) or [])
+        print(f"[{message.type}] {content}" + (f" (tool calls: {tool_calls})" if tool_calls else ""))
+
+
+def _update_messages(update: dict) -> list:
+    """The messages added by an "updates" stream item, which maps each node that ran to its state update."""
+    messages = []
+    for node_update in update.values():
+        if isinstance(node_update, dict):
+            messages.extend(node_update.get("messages") or [])
+    return messages
+
+
+async def process_stream(stream, add_message=None, echo_level: EchoLevel = EchoLevel.FULL, input_messages=()):
     """
     Stream messages and update conversation in real-time.
 
+    The stream must be created with stream_mode="updates", so that each item only holds the messages
+    added by a node instead of the whole, growing message list.
+
     Parameters:
-        stream (async generator): The stream of messages.
+        stream (async generator): The stream of state updates.
         add_message (function, optional): A callback function to handle the resolution of a new message.
-                                          Defaults to printing the message.
-    """
-    conversation = []  # Initialize an empty list to store the conversation as dictionaries
+        echo_level (EchoLevel): How much of each message to print to the console.
+        input_messages (sequence): The input messages of the turn, which the updates do not contain.
 
-    def console_print_message(message):
-        if isinstance(message, tuple):
-            print(message)  # Print the tuple message
-        else:
-            message.pretty_print()  # Pretty print other message types
+    Returns:
+        list: The messages of the turn, starting with the input messages.
+    """
+    conversation = convert_to_messages(list(input_messages))
+    for message in conversation:
+        console_print_message(message, echo_level)
 
     # Process the stream
-    async for s in stream:
-        message = s["messages"][-1]  # Get the last message
-        console_print_message(message)
-        if add_message:
-            add_message(message)
-        conversation.append(message)  # Store the message in the conversation list
+    async for update in stream:
+        for message in _update_messages(update):
+            console_print_message(message, echo_level)
+            if add_message:
+                add_message(message)
+            conversation.append(message)  # Store the message in the conversation list
     return conversation  # Return the entire conversation
 
 
+def _chunk_text(chunk: AIMessageChunk) -> str:
+    if isinstance(chunk.content, str):
+        return chunk.content
+    return "".join(part.get("text", "") for part in chunk.content if isinstance(part, dict))
+
+
+async def _emit(on_event, event: dict):
+    result = on_event(event)
+    if inspect.isawaitable(result):
+        await result
+
+
+async def process_message_stream(stream, add_message=None, on_event=None, token_nodes=("agent",),
+                                 echo_level: EchoLevel = EchoLevel.FULL, input_messages=()):
+    """
+    Stream a graph run in "messages" and "updates" mode, surfacing LLM tokens as they are generated.
+
+    Parameters:
+        stream (async generator): A graph stream created with stream_mode=["messages", "updates"].
+        add_message (function, optional): Called with each complete message, like in process_stream.
+        on_event (function, optional): Called, or awaited if it is a coroutine function, with event dicts:
+            {"type": "token", "content": str} for every generated text chunk,
+            {"type": "tool_call", "name": str, "args": dict} when the model calls a tool, and
+            {"type": "tool_result", "name": str, "content": str} when a tool returns.
+        token_nodes (tuple): Graph nodes whose LLM tokens are surfaced; tools calling an LLM are skipped.
+        echo_level (EchoLevel): How much of each complete message to print to the console.
+        input_messages (sequence): The input messages of the turn, which the updates do not contain.
+
+    Returns:
+        list: The complete messages of the turn, as returned by process_stream.
+    """
+    conversation = convert_to_messages(list(input_messages))
+    for message in conversation:
+        console_print_message(message, echo_level)
+
+    async for mode, payload in stream:
+        if mode == "messages":
+            chunk, metadata = payload
+            if (on_event and isinstance(chunk, AIMessageChunk) and metadata.get("langgraph_node") in token_nodes
+                    and (text := _chunk_text(chunk))):
+                await _emit(on_event, {"type": "token", "content": text})
+            continue
+
+        for message in _update_messages(payload):
+            console_print_message(message, echo_level)
+            if add_message:
+                add_message(message)
+            conversation.append(message)
+            if not on_event:
+                continue
+            if isinstance(message, AIMessage):
+                for tool_call in message.tool_calls:
+                    await _emit(on_event, {"type": "tool_call", "name": tool_call["name"], "args": tool_call["args"]})
+            elif isinstance(message, ToolMessage):
+                await _emit(on_event, {"type": "tool_result", "name": message.name, "content": message.content})
+    return conversation
+
+
 def print_answer(stream):
     s = list(stream)[-1]
     message = s["messages"][-1]